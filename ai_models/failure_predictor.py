@@ -1,12 +1,39 @@
+import os
 import numpy as np
 import pandas as pd
+import sklearn
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 import joblib
+from time import perf_counter
 
 print("🤖 AI Failure Predictor for EV Battery")
 print("=" * 50)
 
+# Model inputs in training order, with the defaults used for missing values
+FEATURE_DEFAULTS = {
+    'voltage_drop_rate': 0.1,
+    'temp_increase_rate': 2.0,
+    'cycle_count': 500,
+    'charge_rate': 1.0,
+    'internal_resistance': 0.05
+}
+FEATURE_COLUMNS = list(FEATURE_DEFAULTS)
+
+# Risk bands: status code -> (upper risk bound, status, recommended action)
+RISK_LEVELS = [
+    (0.3, "✅ LOW RISK", "Continue normal operation"),
+    (0.7, "⚠️ MEDIUM RISK", "Monitor closely, reduce load"),
+    (np.inf, "🚨 HIGH RISK", "Immediate maintenance required"),
+]
+RISK_THRESHOLDS = np.array([bound for bound, _, _ in RISK_LEVELS[:-1]])
+RISK_STATUSES = np.array([status for _, status, _ in RISK_LEVELS], dtype=object)
+RISK_ACTIONS = np.array([action for _, _, action in RISK_LEVELS], dtype=object)
+
+# Saved scaler + forest; bump the version when the artifact layout changes
+ARTIFACT_VERSION = 1
+DEFAULT_ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts", "failure_predictor.joblib")
+
 class BatteryFailurePredictor:
     def __init__(self):
         self.model = RandomForestRegressor(n_estimators=100, random_state=42)
@@ -52,7 +79,8 @@ class BatteryFailurePredictor:
         y = self.df['failure_risk']
         
         # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+        # Fit on the raw array so plain-array inference needs no feature names
+        X_scaled = self.scaler.fit_transform(X[FEATURE_COLUMNS].to_numpy())
         
         # Train model
         self.model.fit(X_scaled, y)
@@ -62,48 +90,143 @@ class BatteryFailurePredictor:
         print(f"   - Features: {list(X.columns)}")
         print(f"   - Training score: {self.model.score(X_scaled, y):.3f}")
     
-    def predict_failure(self, battery_params):
+    def predict_failure(self, battery_params, verbose=True):
         """Predict battery failure risk"""
         if not self.is_trained:
             print("❌ Model not trained yet!")
             return None
         
         # Create feature vector
-        features = np.array([[
-            battery_params.get('voltage_drop_rate', 0.1),
-            battery_params.get('temp_increase_rate', 2.0),
-            battery_params.get('cycle_count', 500),
-            battery_params.get('charge_rate', 1.0),
-            battery_params.get('internal_resistance', 0.05)
-        ]])
+        features = np.array([[battery_params.get(name, default) for name, default in FEATURE_DEFAULTS.items()]])
         
         # Scale and predict
         features_scaled = self.scaler.transform(features)
         risk = self.model.predict(features_scaled)[0]
         
         # Interpret results
-        if risk < 0.3:
-            status = "✅ LOW RISK"
-            action = "Continue normal operation"
-        elif risk < 0.7:
-            status = "⚠️ MEDIUM RISK" 
-            action = "Monitor closely, reduce load"
-        else:
-            status = "🚨 HIGH RISK"
-            action = "Immediate maintenance required"
-        
-        print(f"🔮 Failure Risk Prediction:")
-        print(f"   - Risk Score: {risk:.3f}")
-        print(f"   - Status: {status}")
-        print(f"   - Recommended Action: {action}")
+        code = int(np.searchsorted(RISK_THRESHOLDS, risk, side='right'))
+        status, action = RISK_STATUSES[code], RISK_ACTIONS[code]
+        
+        if verbose:
+            print(f"🔮 Failure Risk Prediction:")
+            print(f"   - Risk Score: {risk:.3f}")
+            print(f"   - Status: {status}")
+            print(f"   - Recommended Action: {action}")
         
         return risk, status, action
+    
+    def save(self, path=DEFAULT_ARTIFACT_PATH):
+        """Save the fitted scaler and forest as a versioned, uncompressed joblib artifact"""
+        if not self.is_trained:
+            raise RuntimeError("Model not trained yet!")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        artifact = {
+            'artifact_version': ARTIFACT_VERSION,
+            'feature_columns': FEATURE_COLUMNS,
+            'sklearn_version': sklearn.__version__,
+            'scaler': self.scaler,
+            'model': self.model
+        }
+        # No compression: the artifact is small and loads faster uncompressed
+        tmp_path = f"{path}.tmp"
+        joblib.dump(artifact, tmp_path, compress=0)
+        os.replace(tmp_path, path)
+        print(f"💾 Model saved to {path}")
+    
+    @classmethod
+    def load(cls, path=DEFAULT_ARTIFACT_PATH):
+        """Load a saved predictor into this process.
+        
+        Each process gets its own copy of the forest (scikit-learn copies tree
+        arrays on unpickling); workers that should share one copy can use the
+        memory-mapped ai_models.forest_evaluator.FlatForest export instead.
+        """
+        artifact = joblib.load(path)
+        if artifact.get('artifact_version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported artifact version {artifact.get('artifact_version')}, "
+                             f"expected {ARTIFACT_VERSION}")
+        if list(artifact.get('feature_columns', [])) != FEATURE_COLUMNS:
+            raise ValueError(f"Artifact features {artifact.get('feature_columns')} do not match {FEATURE_COLUMNS}")
+        if artifact.get('sklearn_version') != sklearn.__version__:
+            print(f"⚠️ Artifact saved with scikit-learn {artifact.get('sklearn_version')}, "
+                  f"running {sklearn.__version__}")
+        
+        predictor = cls()
+        predictor.scaler = artifact['scaler']
+        predictor.model = artifact['model']
+        predictor.is_trained = True
+        print(f"📂 Model loaded from {path}")
+        return predictor
+    
+    @classmethod
+    def load_or_train(cls, path=DEFAULT_ARTIFACT_PATH):
+        """Load the saved predictor, training and saving one only on the first cold start"""
+        if os.path.exists(path):
+            return cls.load(path)
+        predictor = cls()
+        predictor.generate_training_data()
+        predictor.train_model()
+        predictor.save(path)
+        return predictor
+    
+    def feature_matrix(self, features):
+        """N x 5 float array from a DataFrame, structured array or plain array of feature rows"""
+        if isinstance(features, pd.DataFrame):
+            return np.column_stack([
+                features[name].to_numpy(dtype=float) if name in features else np.full(len(features), default)
+                for name, default in FEATURE_DEFAULTS.items()
+            ])
+        features = np.asarray(features)
+        if features.dtype.names is not None:
+            return np.column_stack([
+                features[name].astype(float) if name in features.dtype.names else np.full(len(features), default)
+                for name, default in FEATURE_DEFAULTS.items()
+            ])
+        return np.atleast_2d(features).astype(float)
+    
+    def predict_failure_batch(self, features, verbose=False):
+        """Vectorized risk scores, status codes, statuses and actions for N feature rows"""
+        if not self.is_trained:
+            raise RuntimeError("Model not trained yet!")
+        
+        X = self.feature_matrix(features)
+        risk = self.model.predict(self.scaler.transform(X))
+        codes = np.searchsorted(RISK_THRESHOLDS, risk, side='right')
+        
+        if verbose:
+            counts = np.bincount(codes, minlength=len(RISK_LEVELS))
+            print(f"🔮 Batch Failure Risk Prediction ({len(risk)} batteries):")
+            for count, status in zip(counts, RISK_STATUSES):
+                print(f"   - {status}: {count}")
+        
+        return {
+            'risk': risk,
+            'status_code': codes,
+            'status': RISK_STATUSES[codes],
+            'action': RISK_ACTIONS[codes]
+        }
+    
+    def benchmark_inference(self, batch_sizes=(1, 1_000, 1_000_000), seed=0):
+        """Per-row latency of predict_failure_batch at several batch sizes"""
+        rng = np.random.default_rng(seed)
+        results = []
+        for n in batch_sizes:
+            X = np.column_stack([
+                rng.exponential(0.1, n),
+                rng.normal(2, 1, n),
+                rng.integers(100, 2000, n),
+                rng.uniform(0.5, 2.0, n),
+                rng.normal(0.05, 0.02, n)
+            ])
+            start = perf_counter()
+            self.predict_failure_batch(X)
+            elapsed = perf_counter() - start
+            results.append({'batch_size': n, 'total_s': elapsed, 'per_row_us': elapsed / n * 1e6})
+        return results
 
 if __name__ == "__main__":
     # Demo the AI predictor
-    predictor = BatteryFailurePredictor()
-    predictor.generate_training_data()
-    predictor.train_model()
+    predictor = BatteryFailurePredictor.load_or_train()
     
     # Test prediction
     test_battery = {
@@ -115,3 +238,9 @@ if __name__ == "__main__":
     }
     
     predictor.predict_failure(test_battery)
+    
+    # Fleet scoring through the batched path
+    print("\\n⏱️ Batched inference latency:")
+    for result in predictor.benchmark_inference():
+        print(f"   - N={result['batch_size']:>9,}: {result['total_s'] * 1000:9.2f} ms total, "
+              f"{result['per_row_us']:9.3f} µs/row")
@@ -0,0 +1,178 @@
+import os
+from time import perf_counter
+
+import numpy as np
+
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+DEFAULT_FOREST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts", "flat_forest")
+
+
+def _goes_left(x, threshold, mean, scale):
+    # sklearn's split test: StandardScaler output is cast to float32 before the comparison
+    return ((x - mean) / scale).astype(np.float32) <= threshold
+
+
+def fold_thresholds(threshold, mean, scale):
+    """Raw-feature thresholds T with (x <= T) == (float32((x - mean) / scale) <= threshold).
+
+    The naive fold threshold * scale + mean disagrees with sklearn near the
+    split because of the float32 cast, so the exact boundary is found by a
+    vectorized bisection around it.
+    """
+    guess = threshold * scale + mean
+    delta = scale * (np.abs(threshold) + 1.0) * 1e-5
+    lo, hi = guess - delta, guess + delta
+    if not _goes_left(lo, threshold, mean, scale).all() or _goes_left(hi, threshold, mean, scale).any():
+        raise ValueError("Split thresholds could not be bracketed around threshold * scale + mean")
+    for _ in range(100):
+        mid = lo + (hi - lo) / 2
+        left = _goes_left(mid, threshold, mean, scale)
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+        if (np.nextafter(lo, hi) >= hi).all():
+            break
+    return lo
+
+
+class FlatForest:
+    """RandomForestRegressor flattened into NumPy node arrays.
+
+    All trees share one set of node arrays. The StandardScaler is folded into
+    the split thresholds, so raw (unscaled) features go straight in. Leaves
+    point back to themselves, so every sample can take exactly max_depth steps
+    without any per-node branching.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_predictor(cls, predictor):
+        """Export a trained BatteryFailurePredictor (scaler + forest)"""
+        if not predictor.is_trained:
+            raise RuntimeError("Model not trained yet!")
+        mean = np.asarray(predictor.scaler.mean_, dtype=np.float64)
+        scale = np.asarray(predictor.scaler.scale_, dtype=np.float64)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in predictor.model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            feature = np.where(is_leaf, 0, tree.feature)
+            threshold = np.where(is_leaf, 0.0, fold_thresholds(tree.threshold, mean[feature], scale[feature]))
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(tree.value.reshape(n_nodes, -1)[:, 0])
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            np.concatenate(features).astype(np.int32),
+            np.concatenate(thresholds).astype(np.float64),
+            np.concatenate(lefts).astype(np.int32),
+            np.concatenate(rights).astype(np.int32),
+            np.concatenate(values).astype(np.float64),
+            np.asarray(roots, dtype=np.int32),
+            max_depth
+        )
+
+    def predict(self, X):
+        """Mean leaf value over all trees for an (N, n_features) array of raw features.
+        
+        Built for per-tick scoring of small batches; for thousands of rows the
+        compiled sklearn path (predict_failure_batch) is faster.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        n = len(X)
+        # Feature-major flat copy so one 1-D take fetches X[row, feature]
+        x_flat = X.T.ravel()
+        rows = np.arange(n, dtype=np.int64)[:, None]
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).astype(np.int64)
+        for depth in range(self.max_depth):
+            split_feature = self.feature.take(node)
+            go_left = x_flat.take(split_feature * n + rows) <= self.threshold.take(node)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+            # Shallow trees finish early; leaves are self-loops so stopping is always safe
+            if depth % 4 == 3 and (self.left.take(node) == node).all():
+                break
+        return self.value.take(node).mean(axis=1)
+
+    def save(self, directory=DEFAULT_FOREST_DIR):
+        """One .npy per node array so load() can memory-map them"""
+        os.makedirs(directory, exist_ok=True)
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(directory, "max_depth.npy"), np.array(self.max_depth))
+
+    @classmethod
+    def load(cls, directory=DEFAULT_FOREST_DIR, mmap_mode="r"):
+        """Memory-mapped load; processes loading the same files share one copy in the page cache"""
+        # np.asarray drops the np.memmap subclass (slow in take) but keeps the mapping
+        arrays = {name: np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode))
+                  for name in FOREST_ARRAYS}
+        max_depth = np.load(os.path.join(directory, "max_depth.npy"))
+        return cls(max_depth=int(max_depth), **arrays)
+
+
+def benchmark_against_sklearn(predictor, flat_forest, batch_sizes=(1, 10, 100, 1_000, 10_000), repeats=5, seed=0):
+    """Latency of the flat evaluator vs scaler.transform + forest.predict, plus max abs difference"""
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in batch_sizes:
+        X = np.column_stack([
+            rng.exponential(0.1, n),
+            rng.normal(2, 1, n),
+            rng.integers(100, 2000, n),
+            rng.uniform(0.5, 2.0, n),
+            rng.normal(0.05, 0.02, n)
+        ])
+        timings = {}
+        for name, fn in [("sklearn", lambda: predictor.model.predict(predictor.scaler.transform(X))),
+                         ("flat", lambda: flat_forest.predict(X))]:
+            best = np.inf
+            for _ in range(repeats):
+                start = perf_counter()
+                output = fn()
+                best = min(best, perf_counter() - start)
+            timings[name] = (best, output)
+        results.append({
+            "batch_size": n,
+            "sklearn_ms": timings["sklearn"][0] * 1000,
+            "flat_ms": timings["flat"][0] * 1000,
+            "speedup": timings["sklearn"][0] / timings["flat"][0],
+            "max_abs_diff": float(np.max(np.abs(timings["sklearn"][1] - timings["flat"][1]))),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    from ai_models.failure_predictor import BatteryFailurePredictor
+
+    predictor = BatteryFailurePredictor.load_or_train()
+    flat_forest = FlatForest.from_predictor(predictor)
+    flat_forest.save()
+    flat_forest = FlatForest.load()
+    print(f"🌲 Flattened forest: {len(flat_forest.roots)} trees, {len(flat_forest.feature):,} nodes, "
+          f"max depth {flat_forest.max_depth}")
+
+    print("\n⏱️ Flat evaluator vs sklearn:")
+    for row in benchmark_against_sklearn(predictor, flat_forest):
+        print(f"   - N={row['batch_size']:>6,}: sklearn {row['sklearn_ms']:9.3f} ms | flat {row['flat_ms']:9.3f} ms | "
+              f"{row['speedup']:6.1f}x | max |diff| {row['max_abs_diff']:.2e}")
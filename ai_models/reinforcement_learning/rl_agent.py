@@ -1,2 +1,228 @@
-print("Reinforcement Learning Agent - To be implemented")
-print("This will optimize battery parameters")
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+from simulation.fleet_simulation import FleetSensorGenerator
+
+# Discrete actions: every (load %, PWM cooling %) pair the agent may choose each step
+LOAD_LEVELS = np.array([20, 35, 50, 65, 80, 100])
+PWM_LEVELS = np.array([25, 50, 75, 100])
+ACTIONS = np.array([(load, pwm) for load in LOAD_LEVELS for pwm in PWM_LEVELS])
+
+SOC_BINS = np.linspace(20, 95, 9)
+TEMP_BINS = np.array([28, 32, 36, 40, 45, 50, 55, 60, 70])
+N_STATES = (len(SOC_BINS) + 1) * (len(TEMP_BINS) + 1)
+
+# Reward weights: SOC gained and time spent per step vs heat above the target, cell wear and fan energy
+REWARD_WEIGHTS = {'soc': 1.0, 'time': 1.0, 'heat': 0.3, 'degradation': 2.0, 'fan': 0.3}
+TARGET_TEMPERATURE = 40.0
+TARGET_SOC = 95.0
+
+
+class VectorChargingEnv:
+    """N independent charging sessions stepped together as arrays.
+
+    Uses the twin's own charge equations (generate_sensor_data) and heating
+    model (calculate_temperature_effect / predict_temperature's PWM cooling
+    term), with temperature carried as state that relaxes toward ambient.
+    Finished sessions restart in place, so every step is a full batch.
+    """
+
+    def __init__(self, n_envs, base_temperature=25, voltage_range=(9.0, 13.0), noise_level=0.1,
+                 max_steps=120, seed=None):
+        self.n_envs = n_envs
+        self.base_temperature = base_temperature
+        self.voltage_min, self.voltage_max = voltage_range
+        self.noise_level = noise_level
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        self.soc = np.empty(n_envs)
+        self.temperature = np.empty(n_envs)
+        self.steps = np.zeros(n_envs, dtype=np.int64)
+        self.reset(np.ones(n_envs, dtype=bool))
+
+    def reset(self, mask):
+        n = int(mask.sum())
+        self.soc[mask] = self.rng.uniform(20, 60, n)
+        self.temperature[mask] = self.base_temperature + self.rng.uniform(0, 10, n)
+        self.steps[mask] = 0
+
+    def observe(self):
+        """Discrete state index per env from SOC and temperature bins"""
+        return np.digitize(self.soc, SOC_BINS) * (len(TEMP_BINS) + 1) + np.digitize(self.temperature, TEMP_BINS)
+
+    def step(self, actions):
+        """Apply one action index per env; returns (reward, done, info) arrays"""
+        n = self.n_envs
+        rng = self.rng
+        load_factor = ACTIONS[actions, 0] / 100.0
+        cooling_factor = ACTIONS[actions, 1] / 100.0
+
+        # Charge equations of generate_sensor_data
+        charge_rate = (1.0 + load_factor * 0.8) * (1.2 + rng.uniform(0, 0.8, n))
+        new_soc = np.minimum(98, self.soc + charge_rate)
+        current = 25 + load_factor * 15 + rng.uniform(0, 12, n)
+        voltage = (self.voltage_min + (new_soc / 100) * (self.voltage_max - self.voltage_min) / 2
+                   + rng.normal(0, self.noise_level, n))
+
+        # Heating of calculate_temperature_effect, damped by PWM cooling as in predict_temperature
+        heating = FleetSensorGenerator.temperature_effect(current, voltage, True, load_factor)
+        effective_heating = heating * (1.0 - cooling_factor * 0.4)
+        temperature = self.temperature + effective_heating - (self.temperature - self.base_temperature) * 0.08
+        temperature = np.clip(temperature, 15, 85)
+
+        degradation = np.maximum(0, temperature - 30) * 0.15 * 0.1 + load_factor * 0.1 * 0.1
+        reward = (REWARD_WEIGHTS['soc'] * (new_soc - self.soc) - REWARD_WEIGHTS['time']
+                  - REWARD_WEIGHTS['heat'] * np.maximum(0, temperature - TARGET_TEMPERATURE)
+                  - REWARD_WEIGHTS['degradation'] * degradation
+                  - REWARD_WEIGHTS['fan'] * cooling_factor)
+
+        self.soc = new_soc
+        self.temperature = temperature
+        self.steps += 1
+        done = (new_soc >= TARGET_SOC) | (self.steps >= self.max_steps)
+        # Copies, because reset() overwrites the finished envs' state in place
+        info = {'soc': new_soc.copy(), 'temperature': temperature.copy(), 'degradation': degradation,
+                'steps': self.steps.copy()}
+        if done.any():
+            self.reset(done)
+        return reward, done, info
+
+
+class ChargingQAgent:
+    """Tabular Q-learning over VectorChargingEnv states, updated for all envs per step.
+
+    Updates from envs that hit the same (state, action) in one step are
+    averaged rather than summed, so the learning rate does not scale with
+    the number of environments.
+    """
+
+    def __init__(self, learning_rate=0.1, discount=0.95, epsilon=0.2, seed=None):
+        self.q = np.zeros((N_STATES, len(ACTIONS)))
+        self.visits = np.zeros((N_STATES, len(ACTIONS)))
+        self.learning_rate = learning_rate
+        self.discount = discount
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng(seed)
+
+    def act(self, states, greedy=False):
+        actions = self.q[states].argmax(axis=1)
+        if not greedy:
+            explore = self.rng.random(len(states)) < self.epsilon
+            actions[explore] = self.rng.integers(0, len(ACTIONS), explore.sum())
+        return actions
+
+    def update(self, states, actions, rewards, next_states, done):
+        target = rewards + self.discount * self.q[next_states].max(axis=1) * ~done
+        flat = states * len(ACTIONS) + actions
+        td_sum = np.bincount(flat, weights=target - self.q[states, actions], minlength=self.q.size)
+        counts = np.bincount(flat, minlength=self.q.size)
+        seen = counts > 0
+        q = self.q.reshape(-1)
+        q[seen] += self.learning_rate * td_sum[seen] / counts[seen]
+        self.visits.reshape(-1)[:] += counts
+
+    def policy(self):
+        """Greedy (load %, PWM %) per state, as an (N_STATES, 2) array"""
+        return ACTIONS[self.q.argmax(axis=1)]
+
+
+def train(agent, env, n_steps):
+    """Run n_steps of every env in lockstep, learning online; returns steps/sec"""
+    states = env.observe()
+    start = perf_counter()
+    for _ in range(n_steps):
+        actions = agent.act(states)
+        rewards, done, _ = env.step(actions)
+        next_states = env.observe()
+        agent.update(states, actions, rewards, next_states, done)
+        states = next_states
+    elapsed = perf_counter() - start
+    return n_steps * env.n_envs / elapsed
+
+
+def _train_round(args):
+    q, n_envs, n_steps, epsilon, seed = args
+    agent = ChargingQAgent(epsilon=epsilon, seed=seed)
+    agent.q = q.copy()
+    train(agent, VectorChargingEnv(n_envs, seed=seed), n_steps)
+    return agent.q, agent.visits
+
+
+def train_parallel(agent, workers=None, envs_per_worker=1024, rounds=10, steps_per_round=200, seed=0):
+    """Each worker process trains its own env batch from the shared Q-table; rounds merge them.
+
+    Tables are merged by averaging each (state, action) entry over the
+    workers that visited it, weighted by visits. Returns steps/sec overall.
+    """
+    workers = workers or os.cpu_count()
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for round_index in range(rounds):
+            tasks = [(agent.q, envs_per_worker, steps_per_round, agent.epsilon, seed + round_index * workers + w)
+                     for w in range(workers)]
+            results = list(pool.map(_train_round, tasks))
+            visits = sum(visits for _, visits in results)
+            merged = sum(q * visits for q, visits in results)
+            seen = visits > 0
+            agent.q[seen] = merged[seen] / visits[seen]
+            agent.visits += visits
+    elapsed = perf_counter() - start
+    return workers * envs_per_worker * steps_per_round * rounds / elapsed
+
+
+def evaluate_policy(choose_actions, n_envs=2000, n_steps=200, seed=123):
+    """Mean return, minutes, peak temperature and wear per completed charging session"""
+    env = VectorChargingEnv(n_envs, seed=seed)
+    episode_return = np.zeros(n_envs)
+    episode_peak = np.zeros(n_envs)
+    episode_wear = np.zeros(n_envs)
+    totals = {'return': 0.0, 'peak_temperature': 0.0, 'degradation': 0.0, 'steps': 0}
+    sessions = 0
+    for _ in range(n_steps):
+        rewards, done, info = env.step(choose_actions(env.observe()))
+        episode_return += rewards
+        episode_wear += info['degradation']
+        episode_peak = np.maximum(episode_peak, info['temperature'])
+        if done.any():
+            sessions += done.sum()
+            totals['return'] += episode_return[done].sum()
+            totals['peak_temperature'] += episode_peak[done].sum()
+            totals['degradation'] += episode_wear[done].sum()
+            totals['steps'] += info['steps'][done].sum()
+            episode_return[done] = episode_peak[done] = episode_wear[done] = 0
+    return {name: total / max(sessions, 1) for name, total in totals.items()}
+
+
+def fixed_policy(load, pwm):
+    action = int(np.flatnonzero((ACTIONS[:, 0] == load) & (ACTIONS[:, 1] == pwm))[0])
+    return lambda states: np.full(len(states), action)
+
+
+if __name__ == "__main__":
+    print("🎮 RL Charging Optimizer (load % + PWM cooling)")
+    print("=" * 50)
+
+    print("⏱️ Environment throughput (single process):")
+    for n_envs in [1, 64, 1024, 8192]:
+        rate = train(ChargingQAgent(seed=0), VectorChargingEnv(n_envs, seed=0), min(5_000, 200_000 // n_envs))
+        print(f"   - {n_envs:>5} envs: {rate:12,.0f} env steps/sec")
+
+    agent = ChargingQAgent(seed=0)
+    workers = min(os.cpu_count() or 1, 8)
+    rate = train_parallel(agent, workers=workers, envs_per_worker=1024, rounds=10, steps_per_round=200)
+    print(f"   - {workers} worker processes x 1024 envs: {rate:12,.0f} env steps/sec")
+
+    print("\n📊 Greedy learned policy vs fixed settings (per charging session):")
+    policies = {
+        "learned": lambda states: agent.act(states, greedy=True),
+        "default (50% / 75%)": fixed_policy(50, 75),
+        "max load, max cooling": fixed_policy(100, 100),
+        "gentle (35% / 50%)": fixed_policy(35, 50),
+    }
+    for name, choose in policies.items():
+        result = evaluate_policy(choose)
+        print(f"   - {name:<22} return {result['return']:6.1f} | {result['steps']:4.1f} steps | "
+              f"peak {result['peak_temperature']:5.1f}°C | wear {result['degradation']:.2f}")
@@ -0,0 +1,350 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from statistics import mean, median, stdev
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+SEED = 1234
+BENCHMARKS = {}
+
+
+def benchmark(name, group="core", repeats=5, number=1):
+    """Register a benchmark; the decorated setup function returns the callable to time"""
+    def register(setup):
+        BENCHMARKS[name] = {"setup": setup, "group": group, "repeats": repeats, "number": number}
+        return setup
+    return register
+
+
+def _twin(fault_injected=False):
+    from streamlit_app import EVDigitalTwin
+    digital_twin = EVDigitalTwin()
+    digital_twin.fault_injected = fault_injected
+    return digital_twin
+
+
+def _history_samples(n_rows):
+    from streamlit_app import generate_sensor_data
+    digital_twin = _twin()
+    np.random.seed(SEED)
+    samples, soc = [], 65
+    for _ in range(n_rows):
+        sample = generate_sensor_data(soc, True, digital_twin)
+        soc = sample['soc'] if sample['soc'] < 95 else 20
+        samples.append(sample)
+    return samples
+
+
+def _filled_history(n_rows):
+    from dashboard.telemetry_history import TelemetryHistory
+    history = TelemetryHistory(n_rows)
+    for sample in _history_samples(n_rows):
+        history.append(sample)
+    return history
+
+
+@benchmark("generate_sensor_data x1000")
+def bench_generate_sensor_data():
+    from streamlit_app import generate_sensor_data
+    digital_twin = _twin()
+
+    def run():
+        for _ in range(1000):
+            generate_sensor_data(65, True, digital_twin)
+    return run
+
+
+@benchmark("simulate_fault x1000")
+def bench_simulate_fault():
+    from streamlit_app import generate_sensor_data
+    digital_twin = _twin(fault_injected=True)
+    sample = generate_sensor_data(65, True, digital_twin)
+
+    def run():
+        for _ in range(1000):
+            digital_twin.simulate_fault(dict(sample))
+    return run
+
+
+@benchmark("predict_temperature x10000")
+def bench_predict_temperature():
+    digital_twin = _twin()
+
+    def run():
+        for _ in range(10_000):
+            digital_twin.predict_temperature(35.0, 30.0, 11.5, True)
+    return run
+
+
+@benchmark("rolling_stats.update 1000 vehicles x100", group="core")
+def bench_rolling_stats():
+    from dashboard.rolling_stats import RollingStats
+    rng = np.random.default_rng(SEED)
+    samples = rng.normal(11.5, 0.5, (100, 1000, 6))
+    stats = RollingStats(window=50, n_streams=1000)
+
+    def run():
+        for values in samples:
+            stats.update(values)
+    return run
+
+
+@benchmark("thermal_model.forecast 10k packs x 4 scenarios x 60 steps", group="core")
+def bench_thermal_forecast():
+    from simulation.thermal_model import LumpedThermalModel
+    rng = np.random.default_rng(SEED)
+    model = LumpedThermalModel()
+    temperature = rng.uniform(25, 45, 10_000)[:, None]
+    current = rng.uniform(25, 52, (10_000, 1, 60))
+    load = np.array([25, 50, 75, 100])[None, :, None]
+    return lambda: model.forecast(temperature, current, 11.0, True, load, 75, 25.0, 60)
+
+
+@benchmark("failure_predictor.generate_training_data", group="ai")
+def bench_generate_training_data():
+    from ai_models.failure_predictor import BatteryFailurePredictor
+    predictor = BatteryFailurePredictor()
+    return predictor.generate_training_data
+
+
+@benchmark("failure_predictor.train_model", group="ai", repeats=3)
+def bench_train_model():
+    from ai_models.failure_predictor import BatteryFailurePredictor
+    predictor = BatteryFailurePredictor()
+    predictor.generate_training_data()
+    return predictor.train_model
+
+
+def _trained_predictor():
+    from ai_models.failure_predictor import BatteryFailurePredictor
+    predictor = BatteryFailurePredictor()
+    predictor.generate_training_data()
+    predictor.train_model()
+    return predictor
+
+
+@benchmark("failure_predictor.predict_failure x20", group="ai")
+def bench_predict_failure():
+    predictor = _trained_predictor()
+    params = {'voltage_drop_rate': 0.15, 'temp_increase_rate': 3.5, 'cycle_count': 1200,
+              'charge_rate': 1.5, 'internal_resistance': 0.08}
+
+    def run():
+        for _ in range(20):
+            predictor.predict_failure(params, verbose=False)
+    return run
+
+
+@benchmark("failure_predictor.predict_failure_batch 10k", group="ai")
+def bench_predict_failure_batch():
+    predictor = _trained_predictor()
+    rng = np.random.default_rng(SEED)
+    X = np.column_stack([rng.exponential(0.1, 10_000), rng.normal(2, 1, 10_000),
+                         rng.integers(100, 2000, 10_000), rng.uniform(0.5, 2.0, 10_000),
+                         rng.normal(0.05, 0.02, 10_000)])
+    return lambda: predictor.predict_failure_batch(X)
+
+
+@benchmark("lstm_predictor.predict_batch 1024 windows", group="ai")
+def bench_lstm_predict_batch():
+    from ai_models.lstm_predictor import BatteryLSTMPredictor
+    predictor = BatteryLSTMPredictor()
+    windows = predictor.generate_training_data(n_vehicles=8, n_steps=200)
+    predictor.train_model(windows, epochs=1)
+    x = windows.batch(np.arange(1024))[0].transpose(1, 0, 2)
+    return lambda: predictor.predict_batch(x)
+
+
+@benchmark("rl_agent.train 1024 envs x 50 steps", group="ai")
+def bench_rl_train():
+    from ai_models.reinforcement_learning.rl_agent import ChargingQAgent, VectorChargingEnv, train
+    agent = ChargingQAgent(seed=SEED)
+    env = VectorChargingEnv(1024, seed=SEED)
+    return lambda: train(agent, env, 50)
+
+
+@benchmark("battery_model.simulate_drive_cycle UDDS cold", group="pybamm", repeats=2)
+def bench_drive_cycle_cold():
+    from simulation.battery_model import BatteryDigitalTwin
+
+    def run():
+        BatteryDigitalTwin(verbose=False).simulate_drive_cycle("UDDS")
+    return run
+
+
+@benchmark("battery_model.simulate_drive_cycle UDDS warm", group="pybamm")
+def bench_drive_cycle_warm():
+    from simulation.battery_model import BatteryDigitalTwin
+    battery = BatteryDigitalTwin(verbose=False)
+    battery.simulate_drive_cycle("UDDS")
+    return lambda: battery.simulate_drive_cycle("UDDS")
+
+
+@benchmark("voltage_surrogate.pack_voltage 10k packs", group="pybamm")
+def bench_voltage_surrogate():
+    from simulation.voltage_surrogate import VoltageSurrogate
+    surrogate = VoltageSurrogate.load_or_build()
+    rng = np.random.default_rng(SEED)
+    soc, current, temperature = rng.uniform(20, 95, 10_000), rng.uniform(-40, 40, 10_000), rng.uniform(15, 45, 10_000)
+    return lambda: surrogate.pack_voltage(soc, current, temperature)
+
+
+@benchmark("charts: DataFrame from list of dicts (200 rows)", group="dashboard")
+def bench_chart_frame_legacy():
+    samples = _history_samples(200)
+    return lambda: pd.DataFrame(samples)[['voltage', 'soc', 'temperature', 'current', 'efficiency']]
+
+
+@benchmark("charts: TelemetryHistory.to_frame (200 rows)", group="dashboard", number=100)
+def bench_chart_frame_200():
+    history = _filled_history(200)
+    return lambda: history.to_frame(['voltage', 'soc', 'temperature', 'current', 'efficiency'])
+
+
+@benchmark("charts: TelemetryHistory.to_frame (100k rows)", group="dashboard", number=100)
+def bench_chart_frame_100k():
+    history = _filled_history(100_000)
+    return lambda: history.to_frame(['voltage', 'soc', 'temperature', 'current', 'efficiency'])
+
+
+@benchmark("charts: downsample_frame minmax (100k rows)", group="dashboard", number=10)
+def bench_downsample_minmax():
+    from dashboard.downsampling import downsample_frame
+    df = _filled_history(100_000).to_frame(['current', 'efficiency'])
+    return lambda: downsample_frame(df, method="minmax")
+
+
+@benchmark("charts: downsample_frame lttb (100k rows)", group="dashboard")
+def bench_downsample_lttb():
+    from dashboard.downsampling import downsample_frame
+    df = _filled_history(100_000).to_frame(['current', 'efficiency'])
+    return lambda: downsample_frame(df, method="lttb")
+
+
+@benchmark("export_history csv (10k rows)", group="dashboard")
+def bench_export_csv():
+    import tempfile
+    from dashboard.export import export_history
+    history = _filled_history(10_000)
+    path = os.path.join(tempfile.mkdtemp(), "battery_performance.csv")
+    return lambda: export_history(history, path)
+
+
+@benchmark("export_history parquet (10k rows)", group="dashboard")
+def bench_export_parquet():
+    import tempfile
+    from dashboard.export import export_history
+    history = _filled_history(10_000)
+    path = os.path.join(tempfile.mkdtemp(), "battery_performance.parquet")
+    return lambda: export_history(history, path)
+
+
+def time_benchmark(spec):
+    """Run setup once, then time `repeats` rounds of `number` calls; stats are per call"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        np.random.seed(SEED)
+        fn = spec["setup"]()
+        timings = []
+        for _ in range(spec["repeats"]):
+            np.random.seed(SEED)
+            start = perf_counter()
+            for _ in range(spec["number"]):
+                fn()
+            timings.append((perf_counter() - start) / spec["number"])
+    return {
+        "group": spec["group"],
+        "repeats": spec["repeats"],
+        "number": spec["number"],
+        "min_s": min(timings),
+        "median_s": median(timings),
+        "mean_s": mean(timings),
+        "stdev_s": stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Benchmarks whose best time got slower than baseline by more than threshold (fraction).
+
+    The minimum over repeats is the least noisy statistic on a shared machine.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        ratio = result["min_s"] / previous["min_s"]
+        if ratio > 1 + threshold:
+            regressions.append({"name": name, "baseline_s": previous["min_s"],
+                                "current_s": result["min_s"], "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EV Digital Twin benchmark suite")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--groups", nargs="+", help="Only run these groups (core, ai, pybamm, dashboard)")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Flag regressions slower than baseline by more than this fraction")
+    args = parser.parse_args(argv)
+
+    selected = {name: spec for name, spec in BENCHMARKS.items()
+                if (not args.groups or spec["group"] in args.groups)
+                and (not args.filter or args.filter in name)}
+
+    print("⏱️ EV Digital Twin Benchmark Suite")
+    print("=" * 78)
+    results = {}
+    for name, spec in selected.items():
+        results[name] = time_benchmark(spec)
+        print(f"   {name:<52} min {results[name]['min_s'] * 1000:10.3f} ms | "
+              f"median {results[name]['median_s'] * 1000:10.3f} ms")
+
+    report = {
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": SEED,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"🚨 {len(regressions)} regression(s) beyond {args.threshold:.0%} vs {baseline.get('commit')}:")
+            for regression in regressions:
+                print(f"   - {regression['name']}: {regression['baseline_s'] * 1000:.3f} ms → "
+                      f"{regression['current_s'] * 1000:.3f} ms ({regression['ratio']:.2f}x)")
+            return 1
+        print(f"✅ No regressions beyond {args.threshold:.0%} vs {baseline.get('commit')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class CoSimulationWorker:
+    """Runs a physics co-simulation on its own thread, so solves never hold the twin engine's lock.
+
+    `submit(request)` queues one tick's request and returns at once. The
+    worker builds the co-simulation from the first request with
+    `build_fn(request)`, then calls `step_fn(cosimulation, request)` for each
+    request in order and keeps the result as `latest`. A build or solver error
+    stops the worker and is kept in `error`; the twin carries on without
+    physics until `reset()`.
+    """
+
+    def __init__(self, build_fn, step_fn, max_pending=100):
+        self.build_fn = build_fn
+        self.step_fn = step_fn
+        self.max_pending = max_pending
+        self._thread = None
+        self.reset()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, request):
+        """Queue a step without waiting for it; returns False once the worker has failed"""
+        if self.error is not None:
+            return False
+        if not self.running:
+            self._thread = threading.Thread(target=self._run, args=(self._queue, self._stop_event),
+                                            name="cosim-worker", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            # A build or a slow solver is behind the twin; drop ticks rather than grow without bound
+            self.dropped += 1
+        return True
+
+    def reset(self, timeout=2.0):
+        """Stop the thread and forget the co-simulation, its state and any error"""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join(timeout)
+        self._thread = None
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._stop_event = threading.Event()
+        self.status = "idle"
+        self.latest = None
+        self.error = None
+        self.dropped = 0
+
+    def _run(self, requests, stop_event):
+        # A reset() may give up on this thread mid-solve; it then must not touch the new state
+        cosimulation = None
+        while not stop_event.is_set():
+            try:
+                request = requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if cosimulation is None:
+                    self.status = "building"
+                    cosimulation = self.build_fn(request)
+                    if stop_event.is_set():
+                        return
+                    self.status = "running"
+                state = self.step_fn(cosimulation, request)
+            except Exception as e:
+                if not stop_event.is_set():
+                    logger.exception("Co-simulation failed; continuing without physics")
+                    self.error = e
+                    self.status = "failed"
+                return
+            if stop_event.is_set():
+                return
+            self.latest = state
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+# Roughly two points per pixel of a half-width dashboard chart
+CHART_MAX_POINTS = 1000
+
+
+def minmax_indices(y, n_out):
+    """Indices of the min and max of each bucket, plus both endpoints.
+
+    Every local extreme survives, so fault spikes stay visible however long
+    the history grows. Fully vectorized: one reshape and two argmin/argmax.
+    """
+    y = np.asarray(y)
+    n = len(y)
+    if n <= n_out or n_out < 6:
+        return np.arange(n)
+
+    # Two picks per bucket, two endpoints and up to two from a ragged tail
+    n_buckets = max(1, (n_out - 4) // 2)
+    bucket = -(-(n - 2) // n_buckets)
+    full = (n - 2) // bucket
+    interior = y[1:1 + full * bucket].reshape(full, bucket)
+    starts = np.arange(full) * bucket + 1
+    picks = [np.array([0]), starts + interior.argmin(axis=1), starts + interior.argmax(axis=1)]
+
+    tail = y[1 + full * bucket:n - 1]
+    if len(tail):
+        offset = 1 + full * bucket
+        picks.append(np.array([offset + tail.argmin(), offset + tail.argmax()]))
+    picks.append(np.array([n - 1]))
+    return np.unique(np.concatenate(picks))
+
+
+def lttb_indices(y, n_out):
+    """Largest-Triangle-Three-Buckets: keeps the visually dominant point per bucket.
+
+    Smoother-looking than min-max for the same budget, but one bucket per
+    Python iteration, so it is the slower of the two.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket is the third vertex of the triangle
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = (stop + next_stop - 1) / 2.0
+        next_y = y[stop:next_stop].mean()
+        x = np.arange(start, stop)
+        area = np.abs((a - next_x) * (y[start:stop] - y[a]) - (a - x) * (next_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+DOWNSAMPLERS = {"minmax": minmax_indices, "lttb": lttb_indices}
+
+
+def downsample_frame(df, max_points=CHART_MAX_POINTS, method="minmax"):
+    """Reduce a telemetry frame to about max_points rows for charting.
+
+    The point budget is shared between columns and the union of each
+    column's picks is kept, so a spike in any channel survives. The original
+    row positions stay as the index, keeping the x-axis in sample steps.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    pick = DOWNSAMPLERS[method]
+    per_column = max(6, max_points // max(1, df.shape[1]))
+    indices = np.unique(np.concatenate([pick(df[name].to_numpy(), per_column) for name in df.columns]))
+    return pd.DataFrame({name: df[name].to_numpy()[indices] for name in df.columns}, index=indices)
+
+
+if __name__ == "__main__":
+    import time
+
+    print("📉 Chart Downsampling Demo")
+    print("=" * 40)
+    rng = np.random.default_rng(42)
+    n = 100_000
+    voltage = 11.5 + 0.3 * np.sin(np.linspace(0, 20, n)) + rng.normal(0, 0.02, n)
+    spike = 73_421
+    voltage[spike] = 9.8
+    df = pd.DataFrame({"voltage": voltage.astype(np.float32)})
+
+    for method in DOWNSAMPLERS:
+        start = time.perf_counter()
+        small = downsample_frame(df, method=method)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"   - {method:<6} {n:,} → {len(small):,} points in {elapsed:.2f} ms | "
+              f"spike kept: {spike in small.index} | min {small['voltage'].min():.2f} V")
@@ -0,0 +1,95 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_DUMP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 ".cache", "diagnostics", "stage_timings.json")
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _no_lap(name):
+    pass
+
+
+class StageProfiler:
+    """Rolling per-stage timings with p50/p95/p99.
+
+    When disabled every entry point returns a shared no-op, so instrumented
+    code only pays for one attribute check.
+    """
+
+    def __init__(self, window=1000, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        self._timings = {}
+        self._lock = threading.Lock()
+        self._last_dump = 0.0
+
+    def record(self, name, seconds):
+        timings = self._timings.get(name)
+        if timings is None:
+            with self._lock:
+                timings = self._timings.setdefault(name, deque(maxlen=self.window))
+        # deque.append is atomic, so the engine thread and the UI can both record
+        timings.append(seconds)
+
+    def span(self, name):
+        """Context manager timing one stage"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name)
+
+    @contextlib.contextmanager
+    def _span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def stopwatch(self, prefix=""):
+        """Callable lap(name) recording the time since the previous lap (or creation)"""
+        if not self.enabled:
+            return _no_lap
+        last = [time.perf_counter()]
+
+        def lap(name):
+            now = time.perf_counter()
+            self.record(prefix + name, now - last[0])
+            last[0] = now
+        return lap
+
+    def summary(self):
+        """{stage: {count, p50_ms, p95_ms, p99_ms, max_ms}} over the rolling window"""
+        with self._lock:
+            stages = {name: np.array(timings) for name, timings in self._timings.items()}
+        result = {}
+        for name, values in sorted(stages.items()):
+            if not len(values):
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+            result[name] = {"count": len(values), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+                            "max_ms": values.max() * 1000}
+        return result
+
+    def dump(self, path=DEFAULT_DUMP_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"window": self.window, "stages": self.summary()}, f, indent=2)
+        self._last_dump = time.monotonic()
+        return path
+
+    def dump_if_due(self, path=DEFAULT_DUMP_PATH, interval=30.0):
+        if self.enabled and time.monotonic() - self._last_dump >= interval:
+            return self.dump(path)
+        return None
+
+    def reset(self):
+        with self._lock:
+            self._timings = {}
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Column layout of one generate_sensor_data sample
+TELEMETRY_COLUMNS = {
+    'voltage': np.float32,
+    'current': np.float32,
+    'temperature': np.float32,
+    'soc': np.float32,
+    'health_score': np.float32,
+    'timestamp': 'U8',
+    'is_charging': np.bool_,
+    'power': np.float32,
+    'energy_remaining': np.float32,
+    'efficiency': np.float32,
+    'energy_consumed': np.float32,
+    'cycles_completed': np.int16,
+    'load_percentage': np.int16,
+    'user_temperature': np.float32,
+    'user_pwm': np.int16,
+}
+
+
+class TelemetryHistory:
+    """Fixed-capacity columnar ring buffer for dashboard sensor history.
+
+    Every column is stored twice back to back (2 x capacity), so the newest
+    `capacity` rows are always one contiguous slice. Appends are O(1) and
+    column reads are zero-copy NumPy views.
+    """
+
+    def __init__(self, capacity, columns=None):
+        self.columns = dict(columns or TELEMETRY_COLUMNS)
+        self.capacity = int(capacity)
+        self._data = {name: np.zeros(2 * self.capacity, dtype=dtype) for name, dtype in self.columns.items()}
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, sample):
+        """Store one sample dict, overwriting the oldest row when full"""
+        if self._size == self.capacity:
+            slot = self._head
+            self._head = (self._head + 1) % self.capacity
+        else:
+            slot = self._size
+            self._size += 1
+        for name, column in self._data.items():
+            value = sample[name]
+            column[slot] = value
+            column[slot + self.capacity] = value
+
+    def column(self, name):
+        """Zero-copy view of one column, oldest row first"""
+        return self._data[name][self._head:self._head + self._size]
+
+    def latest(self):
+        """Newest row as a plain dict"""
+        if not self._size:
+            return None
+        slot = self._head + self._size - 1
+        return {name: column[slot].item() for name, column in self._data.items()}
+
+    def to_frame(self, columns=None):
+        """DataFrame over the stored history; numeric columns are not copied"""
+        names = columns or list(self.columns)
+        return pd.DataFrame({name: self.column(name) for name in names}, copy=False)
+
+    def snapshot(self, columns=None):
+        """Copies of the stored columns, safe to read after the lock is released"""
+        return {name: self.column(name).copy() for name in columns or self.columns}
+
+    def resize(self, capacity):
+        """Change capacity, keeping the newest rows"""
+        capacity = int(capacity)
+        if capacity == self.capacity:
+            return
+        keep = min(self._size, capacity)
+        data = {}
+        for name, dtype in self.columns.items():
+            column = np.zeros(2 * capacity, dtype=dtype)
+            recent = self.column(name)[self._size - keep:]
+            column[:keep] = recent
+            column[capacity:capacity + keep] = recent
+            data[name] = column
+        self._data = data
+        self.capacity = capacity
+        self._head = 0
+        self._size = keep
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TwinEngine:
+    """Ticks a digital twin on a background thread, independent of page refreshes.
+
+    `step_fn(engine)` produces one sample per tick from `engine.state`; the
+    engine appends it to `history` and keeps it as the latest snapshot. The
+    UI only reads snapshots, holding `lock` while it reads history views so
+    a tick never lands half-way through a chart.
+    """
+
+    def __init__(self, step_fn, history, state=None, tick_hz=1.0, idle_timeout=120.0):
+        self.step_fn = step_fn
+        self.history = history
+        # Mutable simulation state shared between step_fn and the UI
+        self.state = dict(state or {})
+        self.tick_hz = tick_hz
+        # Stop ticking when no UI has read a snapshot for this long (closed tab)
+        self.idle_timeout = idle_timeout
+        self.lock = threading.RLock()
+        self.latest = None
+        self.tick_count = 0
+        self.last_tick_seconds = 0.0
+        self.last_error = None
+        self.error_count = 0
+        self._last_read = time.monotonic()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the tick thread if it is not already running"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._last_read = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="twin-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def set_rate(self, tick_hz):
+        self.tick_hz = max(0.01, float(tick_hz))
+
+    def tick(self):
+        """Advance the twin one step; also usable synchronously without the thread"""
+        with self.lock:
+            start = time.perf_counter()
+            sample = self.step_fn(self)
+            self.history.append(sample)
+            self.latest = sample
+            self.tick_count += 1
+            self.last_tick_seconds = time.perf_counter() - start
+        return sample
+
+    def snapshot(self):
+        """Latest sample and tick count; marks the UI as still attached"""
+        self._last_read = time.monotonic()
+        with self.lock:
+            return self.latest, self.tick_count
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            if time.monotonic() - self._last_read > self.idle_timeout:
+                break
+            try:
+                self.tick()
+                self.last_error = None
+            except Exception as e:
+                # Keep ticking, but make the failure visible: the UI shows last_error
+                if self.last_error is None:
+                    logger.exception("Twin engine tick %d failed", self.tick_count + 1)
+                self.last_error = e
+                self.error_count += 1
+            # Fixed-rate schedule; skip ahead instead of bursting after a stall
+            next_tick += 1.0 / self.tick_hz
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
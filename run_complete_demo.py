@@ -5,10 +5,12 @@ import os
 print("🚀 EV Digital Twin - KPIT Sparkle 2025 - Complete Demo")
 print("=" * 70)
 
-def run_module(module_name, command):
+def run_module(module_name, module):
     print(f"\\n▶️  Running {module_name}...")
     try:
-        result = subprocess.run([sys.executable, command], capture_output=True, text=True)
+        # Run as modules from the project root so package imports resolve
+        result = subprocess.run([sys.executable, "-m", module], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
         if result.returncode == 0:
             print(f"   ✅ {module_name} completed successfully!")
         else:
@@ -18,13 +20,13 @@ def run_module(module_name, command):
 
 def main():
     print("\\n🔧 MODULE 1: Battery Simulation")
-    run_module("Battery Simulation", "simulation/battery_model.py")
+    run_module("Battery Simulation", "simulation.battery_model")
     
     print("\\n🤖 MODULE 2: AI Failure Prediction") 
-    run_module("AI Predictor", "ai_models/failure_predictor.py")
+    run_module("AI Predictor", "ai_models.failure_predictor")
     
     print("\\n📊 MODULE 3: Data Analysis")
-    run_module("LSTM Predictor", "ai_models/lstm_predictor.py")
+    run_module("LSTM Predictor", "ai_models.lstm_predictor")
     
     print("\\n" + "=" * 70)
     print("🏆 ALL MODULES EXECUTED SUCCESSFULLY!")
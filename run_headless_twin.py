@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import resource
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from simulation.history_writer import HistoryWriter
+from dashboard.telemetry_history import TelemetryHistory, TELEMETRY_COLUMNS
+from streamlit_app import EVDigitalTwin, generate_sensor_data
+
+STAGES = ("generate", "fault", "predict", "record", "write")
+OUTPUT_COLUMNS = {**TELEMETRY_COLUMNS, 'step': np.int64, 'predicted_temperature': np.float32}
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+def run_headless(digital_twin, steps=None, duration=None, mode="auto", output=None,
+                 chunk_size=10_000, seed=42, initial_soc=65):
+    """Drive EVDigitalTwin as fast as possible and time every stage of each step"""
+    if steps is None and duration is None:
+        raise ValueError("Give a number of steps, a wall-clock budget, or both")
+    np.random.seed(seed)
+
+    is_charging = mode != "discharge"
+    soc = initial_soc
+    chunk = TelemetryHistory(chunk_size, OUTPUT_COLUMNS)
+    writer = HistoryWriter(output, chunk_rows=chunk_size) if output else None
+    stage_seconds = dict.fromkeys(STAGES, 0.0)
+    step = 0
+    start = perf_counter()
+
+    while (steps is None or step < steps) and (duration is None or perf_counter() - start < duration):
+        t0 = perf_counter()
+        sensor_data = generate_sensor_data(soc, is_charging, digital_twin)
+        t1 = perf_counter()
+        sensor_data = digital_twin.simulate_fault(sensor_data)
+        t2 = perf_counter()
+        sensor_data['predicted_temperature'] = digital_twin.predict_temperature(
+            sensor_data['temperature'], sensor_data['current'], sensor_data['voltage'], sensor_data['is_charging']
+        )
+        t3 = perf_counter()
+        sensor_data['step'] = step
+        chunk.append(sensor_data)
+        t4 = perf_counter()
+
+        stage_seconds["generate"] += t1 - t0
+        stage_seconds["fault"] += t2 - t1
+        stage_seconds["predict"] += t3 - t2
+        stage_seconds["record"] += t4 - t3
+
+        soc = sensor_data['soc']
+        if mode == "auto" and (soc >= 95 or soc <= 20):
+            is_charging = soc <= 20
+        step += 1
+
+        if len(chunk) == chunk_size:
+            t5 = perf_counter()
+            if writer is not None:
+                writer.write(chunk)
+            chunk.clear()
+            stage_seconds["write"] += perf_counter() - t5
+
+    t5 = perf_counter()
+    if writer is not None:
+        if len(chunk) or writer.rows_written == 0:
+            # A run that ends before its first step still leaves a file with the columns
+            writer.write(chunk)
+        writer.close()
+    stage_seconds["write"] += perf_counter() - t5
+    elapsed = perf_counter() - start
+
+    return {
+        "steps": step,
+        "wall_seconds": elapsed,
+        "steps_per_sec": step / elapsed if elapsed else 0.0,
+        "stage_seconds": stage_seconds,
+        "stage_us_per_step": {name: seconds / max(step, 1) * 1e6 for name, seconds in stage_seconds.items()},
+        "peak_rss_mb": peak_rss_mb(),
+        "output": output,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the EV digital twin headless as fast as possible")
+    parser.add_argument("--steps", type=int, help="Number of simulation steps")
+    parser.add_argument("--duration", type=float, help="Wall-clock budget in seconds")
+    parser.add_argument("--mode", choices=["charge", "discharge", "auto"], default="auto")
+    parser.add_argument("--fault", action="store_true", help="Inject fault scenarios")
+    parser.add_argument("--voltage-surrogate", action="store_true",
+                        help="Price pack voltage with the PyBaMM surrogate table (built on first use)")
+    parser.add_argument("--load", type=int, default=50, help="Load percentage")
+    parser.add_argument("--pwm", type=int, default=75, help="PWM cooling percentage")
+    parser.add_argument("--base-temp", type=float, default=25, help="Base temperature (°C)")
+    parser.add_argument("--noise", type=float, default=0.1, help="Sensor noise level")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Rows buffered per file write")
+    parser.add_argument("--output", help="Telemetry output file (.csv or .parquet)")
+    parser.add_argument("--report", help="Write the throughput report as JSON")
+    args = parser.parse_args(argv)
+    if args.steps is None and args.duration is None:
+        args.steps = 10_000
+
+    digital_twin = EVDigitalTwin()
+    digital_twin.load_percentage = args.load
+    digital_twin.pwm_percentage = args.pwm
+    digital_twin.base_temperature = args.base_temp
+    digital_twin.noise_level = args.noise
+    digital_twin.fault_injected = args.fault
+    digital_twin.fault_seed = args.seed
+
+    print("🏎️ Headless EV Digital Twin Runner")
+    print("=" * 50)
+    if args.voltage_surrogate:
+        from simulation.voltage_surrogate import VoltageSurrogate
+        digital_twin.voltage_surrogate = VoltageSurrogate.load_or_build()
+        print(f"⚡ Voltage surrogate: {digital_twin.voltage_surrogate.metadata.get('fidelity', '?')} table")
+    report = run_headless(digital_twin, steps=args.steps, duration=args.duration, mode=args.mode,
+                          output=args.output, chunk_size=args.chunk_size, seed=args.seed)
+
+    print(f"✅ {report['steps']:,} steps in {report['wall_seconds']:.2f} s "
+          f"→ {report['steps_per_sec']:,.0f} steps/sec")
+    for name in STAGES:
+        share = report["stage_seconds"][name] / report["wall_seconds"] * 100 if report["wall_seconds"] else 0
+        print(f"   - {name:<9} {report['stage_seconds'][name]:8.3f} s  "
+              f"{report['stage_us_per_step'][name]:8.2f} µs/step  {share:5.1f}%")
+    print(f"   - Peak RSS: {report['peak_rss_mb']:.1f} MB")
+    if args.output:
+        print(f"💾 Telemetry written to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB)")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import json
+import time
+
+import numpy as np
+
+# type: (telemetry channel, default magnitude, default duration in steps, log message, log status)
+FAULT_TYPES = {
+    'voltage_drop': ('voltage', 1.5, 5, "⚠️ VOLTAGE DROP DETECTED", "DANGER"),
+    'thermal_runaway': ('temperature', 2.5, 20, "🔥 THERMAL RUNAWAY DETECTED", "DANGER"),
+    'sensor_stuck': ('temperature', 0.0, 15, "🔧 SENSOR STUCK", "WARNING"),
+    'sensor_failure': ('current', 0.0, 5, "🔧 CURRENT SENSOR FAILURE", "WARNING"),
+    'over_current': ('current', 2.0, 3, "⚡ OVER-CURRENT DETECTED", "DANGER"),
+}
+DEFAULT_FAULT_LIMITS = {'voltage': 8.5, 'temperature': 85, 'current': 60.0}
+
+
+def fault_event(fault_type, start, duration=None, twins=None, magnitude=None, channel=None):
+    """One scheduled fault; unset fields take the FAULT_TYPES defaults.
+
+    `twins` is None for every twin in a batch, or a list of twin indices.
+    `magnitude` means volts below the limit (voltage_drop), °C per step
+    (thermal_runaway) or amps over the limit (over_current).
+    """
+    if fault_type not in FAULT_TYPES:
+        raise ValueError(f"Unknown fault type {fault_type!r}; use one of {sorted(FAULT_TYPES)}")
+    default_channel, default_magnitude, default_duration, _, _ = FAULT_TYPES[fault_type]
+    return {
+        'type': fault_type,
+        'start': int(start),
+        'duration': int(default_duration if duration is None else duration),
+        'twins': None if twins is None else [int(twin) for twin in np.atleast_1d(twins)],
+        'magnitude': float(default_magnitude if magnitude is None else magnitude),
+        'channel': channel or default_channel,
+    }
+
+
+class FaultScenario:
+    """A timed, scriptable list of fault events, sorted by start step"""
+
+    def __init__(self, events=()):
+        self.events = sorted((fault_event(event['type'], **{key: value for key, value in event.items() if key != 'type'})
+                              for event in events), key=lambda event: event['start'])
+
+    def __len__(self):
+        return len(self.events)
+
+    def add(self, fault_type, start, **kwargs):
+        self.events.append(fault_event(fault_type, start, **kwargs))
+        self.events.sort(key=lambda event: event['start'])
+        return self
+
+    @classmethod
+    def random(cls, n_steps, n_twins=1, mean_interval=25, fault_types=None, seed=None):
+        """Seeded campaign: exponential gaps between faults, random type and target twin"""
+        rng = np.random.default_rng(seed)
+        fault_types = list(fault_types or FAULT_TYPES)
+        # Draw enough gaps to cover the horizon in one go, then trim
+        n_events = int(n_steps / mean_interval * 1.5) + 10
+        starts = np.cumsum(rng.exponential(mean_interval, n_events)).astype(int)
+        starts = starts[starts < n_steps]
+        types = rng.integers(0, len(fault_types), len(starts))
+        targets = rng.integers(0, n_twins, len(starts))
+        durations = rng.uniform(0.5, 1.5, len(starts))
+        events = []
+        for start, type_index, twin, scale in zip(starts, types, targets, durations):
+            fault_type = fault_types[type_index]
+            events.append(fault_event(fault_type, start, duration=max(1, round(FAULT_TYPES[fault_type][2] * scale)),
+                                      twins=None if n_twins == 1 else [twin]))
+        return cls(events)
+
+    def active_mask(self, n_steps, n_twins=1):
+        """(n_steps, n_twins) bool array marking where a fault is active, e.g. as training labels"""
+        mask = np.zeros((n_steps, n_twins), dtype=bool)
+        for event in self.events:
+            twins = slice(None) if event['twins'] is None else event['twins']
+            mask[event['start']:event['start'] + event['duration'], twins] = True
+        return mask
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.events, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+
+class FaultEngine:
+    """Applies a FaultScenario to telemetry arrays, in place.
+
+    `apply(step, sample)` handles one step of (N,) arrays for a live twin or
+    fleet; `apply_run(history)` handles a whole (T, N) run at once, touching
+    only the rows and twins each event covers. Sensor faults change what the
+    sensors report, not the simulated battery state.
+    """
+
+    def __init__(self, scenario, fault_limits=None):
+        self.scenario = scenario
+        self.fault_limits = dict(fault_limits or DEFAULT_FAULT_LIMITS)
+        self.reset()
+
+    def reset(self):
+        self._next = 0
+        self._active = []
+        self._stuck_values = {}
+
+    def _corrupt(self, event, values, offsets):
+        """Faulty readings for `values`; offsets are steps since the event started"""
+        fault_type = event['type']
+        if fault_type == 'voltage_drop':
+            return np.minimum(values, self.fault_limits['voltage'] - event['magnitude'])
+        if fault_type == 'thermal_runaway':
+            return values + event['magnitude'] * (offsets + 1)
+        if fault_type == 'sensor_failure':
+            return np.zeros_like(values)
+        if fault_type == 'over_current':
+            return np.full_like(values, self.fault_limits['current'] + event['magnitude'])
+        raise ValueError(f"No corruption rule for {fault_type!r}")
+
+    def has_work(self, step):
+        """False when apply(step) would be a no-op, so callers can skip building arrays"""
+        events = self.scenario.events
+        return bool(self._active) or (self._next < len(events) and events[self._next]['start'] <= step)
+
+    def apply(self, step, sample):
+        """Corrupt one step of (N,) telemetry arrays; returns the events starting at this step"""
+        events = self.scenario.events
+        onsets = []
+        while self._next < len(events) and events[self._next]['start'] <= step:
+            event = events[self._next]
+            self._next += 1
+            if event['start'] + event['duration'] > step:
+                self._active.append(event)
+                onsets.append(event)
+        if not self._active:
+            return onsets
+
+        still_active = []
+        for event in self._active:
+            offset = step - event['start']
+            if offset >= event['duration']:
+                self._stuck_values.pop(id(event), None)
+                continue
+            still_active.append(event)
+            column = sample[event['channel']]
+            twins = slice(None) if event['twins'] is None else event['twins']
+            if event['type'] == 'sensor_stuck':
+                if id(event) not in self._stuck_values:
+                    self._stuck_values[id(event)] = column[twins].copy()
+                column[twins] = self._stuck_values[id(event)]
+            else:
+                column[twins] = self._corrupt(event, column[twins], offset)
+        self._active = still_active
+        return onsets
+
+    def apply_run(self, history, step_offset=0):
+        """Corrupt a whole run of (T, N) telemetry arrays whose first row is `step_offset`"""
+        n_steps = next(iter(history.values())).shape[0]
+        for event in self.scenario.events:
+            start = event['start'] - step_offset
+            stop = min(start + event['duration'], n_steps)
+            if stop <= 0 or start >= n_steps:
+                continue
+            first = max(start, 0)
+            column = history[event['channel']]
+            twins = slice(None) if event['twins'] is None else event['twins']
+            if event['type'] == 'sensor_stuck':
+                column[first:stop, twins] = column[first, twins]
+            else:
+                offsets = np.arange(first - start, stop - start)[:, None]
+                column[first:stop, twins] = self._corrupt(event, column[first:stop, twins], offsets)
+        return history
+
+
+def benchmark_campaign(n_twins=1000, n_steps=1000, mean_interval=5, repeats=3, seed=42):
+    """Cost of a dense fault campaign relative to generating the fault-free fleet run"""
+    from simulation.fleet_simulation import FleetSensorGenerator
+
+    clean_s = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        history = FleetSensorGenerator(n_twins, seed=seed).run(n_steps)
+        clean_s.append(time.perf_counter() - start)
+
+    # mean_interval is per fleet, so this is one new fault every few steps
+    scenario = FaultScenario.random(n_steps, n_twins, mean_interval=mean_interval, seed=seed)
+    fault_s = []
+    for _ in range(repeats):
+        run = {key: value.copy() for key, value in history.items()}
+        start = time.perf_counter()
+        FaultEngine(scenario).apply_run(run)
+        fault_s.append(time.perf_counter() - start)
+    return {
+        'n_twins': n_twins,
+        'n_steps': n_steps,
+        'n_events': len(scenario),
+        'clean_s': min(clean_s),
+        'fault_s': min(fault_s),
+        'overhead_pct': min(fault_s) / min(clean_s) * 100,
+    }
+
+
+if __name__ == "__main__":
+    print("⚡ Fault Injection Engine Demo")
+    print("=" * 50)
+    scenario = (FaultScenario()
+                .add('voltage_drop', 3, duration=2)
+                .add('thermal_runaway', 6, duration=4)
+                .add('sensor_stuck', 12, duration=3)
+                .add('over_current', 16, duration=2))
+    engine = FaultEngine(scenario)
+    for step in range(20):
+        sample = {'voltage': np.array([11.8]), 'temperature': np.array([32.0 + step * 0.1]),
+                  'current': np.array([-28.0 + step * 0.05])}
+        for event in engine.apply(step, sample):
+            print(f"   step {step:>2}: {FAULT_TYPES[event['type']][3]}")
+        print(f"      V={sample['voltage'][0]:6.2f}  T={sample['temperature'][0]:6.1f}  I={sample['current'][0]:7.2f}")
+
+    print("\n📊 Campaign overhead on a fleet run:")
+    for n_twins, n_steps in [(100, 1000), (1000, 1000)]:
+        result = benchmark_campaign(n_twins, n_steps)
+        print(f"   - {n_twins:>5} twins x {n_steps} steps, {result['n_events']} faults: "
+              f"{result['clean_s']:.3f}s run + {result['fault_s'] * 1000:.2f} ms faults "
+              f"(+{result['overhead_pct']:.2f}%)")
@@ -0,0 +1,73 @@
+import json
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from simulation.battery_model import BatteryDigitalTwin, MODEL_FIDELITIES
+
+BENCHMARK_CYCLES = ("UDDS", "CONSTANT")
+
+
+def rms_error(reference_time, reference, time, values):
+    """RMS difference after interpolating values onto the reference time grid"""
+    return float(np.sqrt(np.mean((np.interp(reference_time, time, values) - reference) ** 2)))
+
+
+def run_fidelity_benchmark(fidelities=tuple(MODEL_FIDELITIES), drive_cycles=BENCHMARK_CYCLES, repeats=3):
+    """Wall time and RMS voltage/temperature error against DFN for every fidelity and drive cycle"""
+    results = {}
+    for fidelity in fidelities:
+        battery = BatteryDigitalTwin(fidelity=fidelity)
+        for drive_cycle in drive_cycles:
+            start = perf_counter()
+            output = battery.simulate_drive_cycle(drive_cycle)
+            first_call = perf_counter() - start
+            warm_times = []
+            for _ in range(repeats):
+                start = perf_counter()
+                battery.simulate_drive_cycle(drive_cycle)
+                warm_times.append(perf_counter() - start)
+            results[(fidelity, drive_cycle)] = {
+                "output": output,
+                "first_call_s": first_call,
+                "warm_call_s": float(np.median(warm_times)),
+            }
+
+    report = []
+    for (fidelity, drive_cycle), entry in results.items():
+        row = {
+            "fidelity": fidelity,
+            "parameter_set": MODEL_FIDELITIES[fidelity][2],
+            "drive_cycle": drive_cycle,
+            "first_call_s": entry["first_call_s"],
+            "warm_call_s": entry["warm_call_s"],
+            "voltage_rms_v": None,
+            "temperature_rms_c": None,
+        }
+        reference = results.get(("DFN", drive_cycle))
+        if reference is not None:
+            ref, out = reference["output"], entry["output"]
+            row["voltage_rms_v"] = rms_error(ref["time"], ref["voltage"], out["time"], out["voltage"])
+            row["temperature_rms_c"] = rms_error(ref["time"], ref["temperature"], out["time"], out["temperature"])
+        report.append(row)
+    return report
+
+
+if __name__ == "__main__":
+    report = run_fidelity_benchmark()
+
+    print("\n📊 Model Fidelity Benchmark (errors against DFN)")
+    print("=" * 86)
+    print(f"{'Model':<6} {'Cycle':<9} {'First call [s]':>15} {'Warm call [s]':>14} {'V RMS [mV]':>12} {'T RMS [°C]':>11}")
+    for row in report:
+        voltage = "-" if row["voltage_rms_v"] is None else f"{row['voltage_rms_v'] * 1000:.2f}"
+        temperature = "-" if row["temperature_rms_c"] is None else f"{row['temperature_rms_c']:.3f}"
+        print(f"{row['fidelity']:<6} {row['drive_cycle']:<9} {row['first_call_s']:>15.3f} "
+              f"{row['warm_call_s']:>14.4f} {voltage:>12} {temperature:>11}")
+    print("Note: ECM uses the ECM_Example cell, so its error includes the cell difference.")
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {sys.argv[1]}")
@@ -0,0 +1,176 @@
+import os
+import time
+
+import numpy as np
+
+# A pack settles at base + net heating * 8 (simulation.thermal_model's time
+# constant in minutes); PWM cooling removes up to 40% of the heating
+THERMAL_TIME_CONSTANT_MIN = 8.0
+PWM_COOLING_GAIN = 0.4
+
+
+class FleetSensorGenerator:
+    """Batched version of streamlit_app.generate_sensor_data for N twins at once"""
+
+    def __init__(self, n_twins, load_percentage=50, pwm_percentage=75, base_temperature=25,
+                 noise_level=0.1, voltage_range=(9.0, 13.0), initial_soc=65, is_charging=True,
+                 seed=None, voltage_surrogate=None):
+        self.n_twins = n_twins
+        # Optional VoltageSurrogate replacing the linear SOC->voltage formula
+        self.voltage_surrogate = voltage_surrogate
+        self.rng = np.random.default_rng(seed)
+
+        # Every parameter may be a scalar (shared by the fleet) or one value per twin
+        self.load_percentage = self._per_twin(load_percentage)
+        self.pwm_percentage = self._per_twin(pwm_percentage)
+        self.base_temperature = self._per_twin(base_temperature)
+        self.noise_level = self._per_twin(noise_level)
+        voltage_range = np.asarray(voltage_range, dtype=float)
+        if voltage_range.ndim == 1:
+            voltage_range = np.broadcast_to(voltage_range, (n_twins, 2))
+        self.voltage_min = voltage_range[:, 0].copy()
+        self.voltage_max = voltage_range[:, 1].copy()
+
+        self.soc = self._per_twin(initial_soc)
+        self.is_charging = np.broadcast_to(np.asarray(is_charging, dtype=bool), (n_twins,)).copy()
+
+    def _per_twin(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.n_twins,)).copy()
+
+    @staticmethod
+    def temperature_effect(current, voltage, is_charging, load_factor):
+        """Vectorized EVDigitalTwin.calculate_temperature_effect"""
+        i2r_heating = (current ** 2) * 0.0008 * load_factor
+        voltage_heating = np.abs(voltage - 12.0) * 0.3 * load_factor
+        charging_heating = np.where(is_charging, 0.6, 0.3) * load_factor
+        return i2r_heating + voltage_heating + charging_heating
+
+    def step(self):
+        """Advance every twin by one step and return a dict of (N,) arrays"""
+        n = self.n_twins
+        rng = self.rng
+        charging = self.is_charging
+        load_factor = self.load_percentage / 100.0
+        span = self.voltage_max - self.voltage_min
+
+        # Draw both branches in one go, then pick per twin - cheaper than masking
+        rate_noise = rng.uniform(0, 1, n)
+        current_noise = rng.uniform(0, 1, n)
+        charge_rate = (1.0 + load_factor * 0.8) * (1.2 + rate_noise * 0.8)
+        discharge_rate = (0.6 + load_factor * 0.6) * (0.8 + rate_noise * 0.6)
+        new_soc = np.where(charging,
+                           np.minimum(98, self.soc + charge_rate),
+                           np.maximum(15, self.soc - discharge_rate))
+        current = np.where(charging,
+                           25 + load_factor * 15 + current_noise * 12,
+                           -20 - load_factor * 20 - current_noise * 15)
+        voltage = self.voltage_min + (new_soc / 100) * span / np.where(charging, 2.0, 1.5)
+        if self.voltage_surrogate is not None:
+            voltage = self.voltage_surrogate.pack_voltage(new_soc, current, self.base_temperature)
+
+        # APPLY USER-DEFINED NOISE
+        voltage = voltage + rng.normal(0, 1, n) * self.noise_level
+        current = current + rng.normal(0, 1, n) * self.noise_level * 0.5
+
+        temp_increase = self.temperature_effect(current, voltage, charging, load_factor)
+        temp_increase = temp_increase * (1.0 - self.pwm_percentage / 100.0 * PWM_COOLING_GAIN)
+        temperature = self.base_temperature + temp_increase * THERMAL_TIME_CONSTANT_MIN + rng.uniform(-1, 1, n)
+
+        health_degradation = (100 - new_soc) * 0.05 + np.maximum(0, temperature - 30) * 0.15 + load_factor * 0.1
+        health_score = np.maximum(45, 97 - health_degradation)
+
+        efficiency = 92 - load_factor * 8 - np.maximum(0, temperature - 25) * 0.3 + rng.uniform(0, 3, n)
+
+        self.soc = new_soc
+        return {
+            'voltage': np.clip(np.round(voltage, 3), self.voltage_min, self.voltage_max),
+            'current': np.round(current, 2),
+            'temperature': np.round(temperature, 1),
+            'soc': np.round(new_soc, 1),
+            'health_score': np.round(health_score, 1),
+            'is_charging': charging.copy(),
+            'power': np.round(voltage * np.abs(current), 2),
+            'energy_remaining': np.round(new_soc * 75 / 100, 1),
+            'efficiency': np.maximum(65, np.round(efficiency, 1)),
+            'energy_consumed': np.round((100 - new_soc) * 0.75, 1),
+            'cycles_completed': rng.integers(1, 10, n),
+        }
+
+    def run(self, n_steps, faults=None):
+        """Advance every twin n_steps times and return a dict of (n_steps, N) arrays.
+
+        `faults` is an optional simulation.fault_simulation.FaultEngine applied
+        to the finished run in one vectorized pass.
+        """
+        history = None
+        for t in range(n_steps):
+            sample = self.step()
+            if history is None:
+                history = {key: np.empty((n_steps, self.n_twins), dtype=value.dtype)
+                           for key, value in sample.items()}
+            for key, value in sample.items():
+                history[key][t] = value
+        if faults is not None:
+            faults.apply_run(history)
+        return history
+
+
+def benchmark_throughput(n_twins=1000, n_steps=1000, seed=42):
+    """Time FleetSensorGenerator.run and return samples (twin-steps) per second"""
+    generator = FleetSensorGenerator(n_twins, seed=seed)
+    start = time.perf_counter()
+    generator.run(n_steps)
+    elapsed = time.perf_counter() - start
+    return {
+        'n_twins': n_twins,
+        'n_steps': n_steps,
+        'elapsed_s': elapsed,
+        'samples_per_sec': n_twins * n_steps / elapsed,
+    }
+
+
+def compare_with_scalar(n_samples=2000, is_charging=False, seed=42, voltage_surrogate=None):
+    """Compare per-channel mean/std of the batched engine against generate_sensor_data"""
+    from streamlit_app import EVDigitalTwin, generate_sensor_data
+
+    twin = EVDigitalTwin()
+    twin.voltage_surrogate = voltage_surrogate
+    np.random.seed(seed)
+    scalar = [generate_sensor_data(65, is_charging, twin) for _ in range(n_samples)]
+
+    # One step from the same starting SOC for many twins matches repeated scalar calls
+    generator = FleetSensorGenerator(
+        n_samples, twin.load_percentage, twin.pwm_percentage, twin.base_temperature,
+        twin.noise_level, twin.voltage_range, initial_soc=65, is_charging=is_charging, seed=seed,
+        voltage_surrogate=twin.voltage_surrogate
+    )
+    batched = generator.step()
+
+    report = {}
+    for key in ['voltage', 'current', 'temperature', 'soc', 'health_score', 'power', 'efficiency']:
+        values = np.array([sample[key] for sample in scalar], dtype=float)
+        report[key] = {
+            'scalar_mean': values.mean(), 'batched_mean': batched[key].mean(),
+            'scalar_std': values.std(), 'batched_std': batched[key].std(),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    print("🚗 Fleet Sensor Generator - Throughput Benchmark")
+    print("=" * 50)
+    for n_twins, n_steps in [(1, 1000), (100, 1000), (1000, 1000), (10000, 200)]:
+        result = benchmark_throughput(n_twins, n_steps)
+        print(f"   - {n_twins:>6} twins x {n_steps:>5} steps: "
+              f"{result['samples_per_sec']:,.0f} samples/sec ({result['elapsed_s']:.3f}s)")
+
+    print("\n📊 Scalar vs batched statistics (discharging):")
+    for key, stats in compare_with_scalar().items():
+        print(f"   - {key:<13} mean {stats['scalar_mean']:8.3f} vs {stats['batched_mean']:8.3f} | "
+              f"std {stats['scalar_std']:7.3f} vs {stats['batched_std']:7.3f}")
+
+    from simulation.voltage_surrogate import DEFAULT_SURROGATE_PATH, VoltageSurrogate
+    if os.path.exists(DEFAULT_SURROGATE_PATH):
+        voltage = compare_with_scalar(voltage_surrogate=VoltageSurrogate.load())['voltage']
+        print(f"   - voltage (surrogate) mean {voltage['scalar_mean']:8.3f} vs {voltage['batched_mean']:8.3f} | "
+              f"std {voltage['scalar_std']:7.3f} vs {voltage['batched_std']:7.3f}")
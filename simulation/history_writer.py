@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_CHUNK_ROWS = 10_000
+EXPORT_MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+PARQUET_COMPRESSIONS = ("zstd", "snappy", "gzip", "none")
+
+
+def export_format(path):
+    return "parquet" if str(path).endswith(".parquet") else "csv"
+
+
+class HistoryWriter:
+    """Appends TelemetryHistory contents to a CSV or Parquet file in fixed-size chunks.
+
+    Each chunk is a zero-copy slice of the history columns, so peak memory
+    is one chunk of output however many rows are written. `target` is a
+    path or an open binary file. `write` also takes a dict of equal-length
+    arrays, so simulation results can be streamed block by block. Writing an
+    empty history before anything else creates a file with only the columns.
+    """
+
+    def __init__(self, target, fmt=None, columns=None, compression="zstd", chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.target = target
+        self.format = fmt or export_format(getattr(target, "name", target))
+        if self.format not in EXPORT_MIME_TYPES:
+            raise ValueError(f"Unknown export format {self.format!r}; use one of {sorted(EXPORT_MIME_TYPES)}")
+        self.columns = columns
+        self.compression = None if compression == "none" else compression
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        self._parquet_writer = None
+        self._csv_file = None
+
+    def write(self, history):
+        for chunk in self._chunks(history):
+            if self.format == "parquet":
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if self._parquet_writer is None:
+                    self._parquet_writer = pq.ParquetWriter(self.target, table.schema, compression=self.compression)
+                self._parquet_writer.write_table(table)
+            else:
+                header = self._csv_file is None
+                if header:
+                    self._csv_file = open(self.target, "wb") if isinstance(self.target, (str, os.PathLike)) else self.target
+                chunk.to_csv(self._csv_file, header=header, index=False)
+            self.rows_written += len(chunk)
+
+    def _chunks(self, history):
+        # Slice the column views before building frames, so string columns are
+        # only converted one chunk at a time
+        if isinstance(history, dict):
+            views = {name: history[name] for name in self.columns or history}
+            n_rows = len(next(iter(views.values()), ()))
+        else:
+            views = {name: history.column(name) for name in self.columns or history.columns}
+            n_rows = len(history)
+        if n_rows == 0 and self._parquet_writer is None and self._csv_file is None:
+            # Nothing written yet: still create the file, with just the header or schema
+            yield pd.DataFrame({name: view[:0] for name, view in views.items()}, copy=False)
+        for start in range(0, n_rows, self.chunk_rows):
+            yield pd.DataFrame({name: view[start:start + self.chunk_rows] for name, view in views.items()},
+                               copy=False)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._csv_file is not None and self._csv_file is not self.target:
+            self._csv_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
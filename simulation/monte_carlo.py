@@ -0,0 +1,275 @@
+import argparse
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+
+import numpy as np
+import pybamm
+
+from simulation.battery_model import BatteryDigitalTwin
+
+# Parameter -> (distribution, *arguments), applied as a multiplier of the nominal value:
+# ("normal", rel_std), ("lognormal", sigma) or ("uniform", low, high)
+DEFAULT_UNCERTAINTY = {
+    "Negative particle diffusivity [m2.s-1]": ("lognormal", 0.3),
+    "Positive particle diffusivity [m2.s-1]": ("lognormal", 0.3),
+    "Negative electrode active material volume fraction": ("normal", 0.03),
+    "Positive electrode active material volume fraction": ("normal", 0.03),
+    "Negative electrode porosity": ("normal", 0.05),
+    "Positive electrode porosity": ("normal", 0.05),
+}
+DEFAULT_PERCENTILES = (5, 50, 95)
+# Channel -> finest bin width of the per-timestep histograms percentiles are read from
+BAND_CHANNELS = {"voltage": 0.0005, "temperature": 0.01}
+# Bins per timestep; each histogram spans the values seen so far, widening by merging bin pairs
+BAND_BINS = 64
+
+# Simulation built once per worker process by _init_worker
+_WORKER = {}
+
+
+def sample_parameters(base_values, distributions, n_samples, seed=None):
+    """Draw n_samples values for every parameter in `distributions`; returns {name: (n_samples,) array}"""
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for name, (kind, *args) in distributions.items():
+        nominal = base_values[name]
+        if kind == "normal":
+            samples[name] = nominal * (1 + args[0] * rng.standard_normal(n_samples))
+        elif kind == "lognormal":
+            samples[name] = nominal * np.exp(args[0] * rng.standard_normal(n_samples))
+        elif kind == "uniform":
+            samples[name] = nominal * rng.uniform(args[0], args[1], n_samples)
+        else:
+            raise ValueError(f"Unknown distribution '{kind}' for {name}; use normal, lognormal or uniform")
+    return samples
+
+
+class StreamingBands:
+    """Per-timestep percentile bands of many runs, reduced one batch at a time.
+
+    Every timestep keeps a small histogram per channel whose range adapts to
+    the values seen so far: when a batch falls outside it, the bin width
+    doubles by merging neighbouring bins, so earlier counts are kept exactly.
+    Memory depends on the time grid and bin count, never on the number of
+    runs. Percentiles are interpolated inside a bin, so their error is below
+    one bin width, a few percent of the spread at that timestep.
+    NaN marks timesteps a run did not reach (e.g. a cut-off).
+    """
+
+    def __init__(self, time_grid, channels=BAND_CHANNELS, n_bins=BAND_BINS):
+        self.time = np.asarray(time_grid, dtype=float)
+        self.channels = dict(channels)
+        self.n_bins = n_bins
+        n_grid = len(self.time)
+        self.counts = {name: np.zeros((n_grid, n_bins), dtype=np.int32) for name in self.channels}
+        # Left edge and width of each timestep's bins; width 0 until the timestep sees a value
+        self.low = {name: np.zeros(n_grid) for name in self.channels}
+        self.width = {name: np.zeros(n_grid) for name in self.channels}
+        self.sums = {name: np.zeros(n_grid) for name in self.channels}
+        self.min = {name: np.full(n_grid, np.inf) for name in self.channels}
+        self.max = {name: np.full(n_grid, -np.inf) for name in self.channels}
+        self.runs = 0
+
+    def update(self, batch):
+        """Add a batch of runs; batch is {channel: (runs, n_grid) array}"""
+        n_bins = self.n_bins
+        reached = None
+        for name in self.channels:
+            values = np.asarray(batch[name], dtype=float)
+            valid = ~np.isnan(values)
+            reached = valid.any(axis=1) if reached is None else reached | valid.any(axis=1)
+            self.sums[name] += np.where(valid, values, 0).sum(axis=0)
+            np.fmin(self.min[name], np.nanmin(np.where(valid, values, np.inf), axis=0), out=self.min[name])
+            np.fmax(self.max[name], np.nanmax(np.where(valid, values, -np.inf), axis=0), out=self.max[name])
+            self._cover(name)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                bins = np.floor((values - self.low[name]) / self.width[name])
+            bins = np.clip(np.nan_to_num(bins), 0, n_bins - 1).astype(np.int64)
+            flat = (np.arange(values.shape[1]) * n_bins + bins)[valid]
+            self.counts[name] += np.bincount(flat, minlength=self.counts[name].size).reshape(
+                self.counts[name].shape).astype(np.int32)
+        # Failed samples come back all-NaN; count only runs with data
+        self.runs += int(reached.sum())
+
+    def _cover(self, name):
+        """Widen every timestep's bins until they span its running min and max"""
+        n_bins = self.n_bins
+        low, width, counts = self.low[name], self.width[name], self.counts[name]
+        lowest, highest = self.min[name], self.max[name]
+
+        # First values at a timestep: centre the bins on them, using half the range
+        new = (width == 0) & np.isfinite(lowest)
+        if new.any():
+            span = (highest[new] - lowest[new]) / (n_bins / 2)
+            resolution = self.channels[name]
+            width[new] = resolution * 2.0 ** np.ceil(np.log2(np.maximum(span / resolution, 1.0)))
+            low[new] = np.floor((lowest[new] + highest[new]) / 2 / width[new]) * width[new] - n_bins // 2 * width[new]
+
+        while True:
+            below = (width > 0) & (lowest < low)
+            above = (width > 0) & (highest >= low + n_bins * width)
+            rows = np.flatnonzero(below | above)
+            if not len(rows):
+                return
+            # Grow towards the side that overflowed (both ways if both did); bin i merges into (i + shift) // 2
+            shift = np.where(below[rows], np.where(above[rows], n_bins // 2, n_bins), 0)
+            target = (np.arange(n_bins)[None, :] + shift[:, None]) // 2
+            flat = (np.arange(len(rows))[:, None] * n_bins + target).ravel()
+            counts[rows] = np.bincount(flat, weights=counts[rows].ravel(),
+                                       minlength=len(rows) * n_bins).reshape(len(rows), n_bins)
+            low[rows] -= shift * width[rows]
+            width[rows] *= 2
+
+    def count(self, name):
+        """Runs that reached each timestep"""
+        return self.counts[name].sum(axis=1)
+
+    def mean(self, name):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sums[name] / self.count(name)
+
+    def percentile(self, name, q):
+        counts = self.counts[name]
+        cumulative = counts.cumsum(axis=1)
+        total = cumulative[:, -1]
+        target = q / 100 * total
+        index = np.minimum((cumulative < target[:, None]).sum(axis=1), counts.shape[1] - 1)
+        rows = np.arange(len(index))
+        below = cumulative[rows, index] - counts[rows, index]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = np.clip((target - below) / counts[rows, index], 0, 1)
+        value = self.low[name] + (index + np.nan_to_num(fraction)) * self.width[name]
+        # Interpolation can overshoot inside the outermost bins; the exact extremes bound the band
+        value = np.clip(value, self.min[name], self.max[name])
+        return np.where(total > 0, value, np.nan)
+
+    def bands(self, percentiles=DEFAULT_PERCENTILES):
+        """{'time', channel: {'mean', 'count', p: array}} for every channel"""
+        result = {'time': self.time}
+        for name in self.channels:
+            result[name] = {'mean': self.mean(name), 'count': self.count(name)}
+            result[name].update({q: self.percentile(name, q) for q in percentiles})
+        return result
+
+    @property
+    def nbytes(self):
+        return sum(state[name].nbytes for state in (self.counts, self.low, self.width, self.sums, self.min, self.max)
+                   for name in self.channels)
+
+
+def cycle_duration(drive_cycle, battery):
+    """Total experiment time of a drive cycle, read from its steps without solving"""
+    return sum(step.duration for step in pybamm.Experiment(list(battery.experiment_steps(drive_cycle))).steps)
+
+
+def _init_worker(fidelity, parameter_set, drive_cycle, parameter_names, time_grid):
+    # Build once per process with the uncertain parameters as inputs, so samples only integrate
+    battery = BatteryDigitalTwin(fidelity=fidelity, parameter_set=parameter_set, verbose=False)
+    parameter_values = battery.parameter_values.copy()
+    nominal = {name: parameter_values[name] for name in parameter_names}
+    parameter_values.update({name: "[input]" for name in parameter_names})
+    simulation = pybamm.Simulation(battery.model, parameter_values=parameter_values,
+                                   experiment=pybamm.Experiment(list(battery.experiment_steps(drive_cycle))),
+                                   solver=battery.solver)
+    simulation.solve(inputs=nominal)
+    _WORKER.update(simulation=simulation, temperature_variable=battery.temperature_variable,
+                   time_grid=np.asarray(time_grid))
+
+
+def run_batch(inputs):
+    """Solve one batch of samples in the worker; returns channel arrays on the shared time grid"""
+    simulation = _WORKER["simulation"]
+    time_grid = _WORKER["time_grid"]
+    n = len(next(iter(inputs.values())))
+    batch = {name: np.full((n, len(time_grid)), np.nan, dtype=np.float32) for name in BAND_CHANNELS}
+    errors = []
+    start = perf_counter()
+    for i in range(n):
+        try:
+            solution = simulation.solve(inputs={name: float(values[i]) for name, values in inputs.items()})
+            time = solution["Time [s]"].data
+            # Timesteps the run did not reach stay NaN instead of holding the last value
+            batch["voltage"][i] = np.interp(time_grid, time, solution["Voltage [V]"].data, right=np.nan)
+            batch["temperature"][i] = np.interp(time_grid, time,
+                                                solution[_WORKER["temperature_variable"]].data - 273.15,
+                                                right=np.nan)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=3)}")
+    return batch, errors, perf_counter() - start
+
+
+def run_monte_carlo(n_samples, distributions=DEFAULT_UNCERTAINTY, drive_cycle="UDDS", fidelity="SPMe",
+                    parameter_set=None, workers=None, batch_size=8, dt=1.0, percentiles=DEFAULT_PERCENTILES,
+                    seed=0, on_batch=None):
+    """Run perturbed drive-cycle simulations on a process pool and reduce them to percentile bands.
+
+    Each worker builds the model once (_init_worker); batches of samples are
+    reduced into StreamingBands as they finish and then dropped, so no
+    per-sample solution outlives its batch.
+    """
+    battery = BatteryDigitalTwin(fidelity=fidelity, parameter_set=parameter_set, verbose=False)
+    names = list(distributions)
+    samples = sample_parameters(battery.parameter_values, distributions, n_samples, seed)
+    time_grid = np.arange(0.0, cycle_duration(drive_cycle, battery) + dt / 2, dt)
+    reducer = StreamingBands(time_grid)
+
+    summary = {"samples": n_samples, "ok": 0, "failed": 0, "errors": [], "solve_seconds": 0.0}
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(fidelity, battery.parameter_set, drive_cycle, names, time_grid)) as pool:
+        futures = {pool.submit(run_batch, {name: values[i:i + batch_size] for name, values in samples.items()}): index
+                   for index, i in enumerate(range(0, n_samples, batch_size))}
+        # Bin edges depend on the order batches arrive in, so fold them in submission order
+        # for bands that repeat exactly with the same seed; only out-of-order batches wait here
+        finished = {}
+        next_index = 0
+        for future in as_completed(futures):
+            finished[futures.pop(future)] = future.result()
+            while next_index in finished:
+                batch, errors, seconds = finished.pop(next_index)
+                next_index += 1
+                reducer.update(batch)
+                summary["failed"] += len(errors)
+                summary["ok"] += len(batch["voltage"]) - len(errors)
+                summary["errors"].extend(errors)
+                summary["solve_seconds"] += seconds
+                if on_batch is not None:
+                    on_batch(reducer)
+    summary["wall_seconds"] = perf_counter() - start
+    summary["samples_per_sec"] = n_samples / summary["wall_seconds"]
+    summary["reducer_bytes"] = reducer.nbytes
+    summary["bands"] = reducer.bands(percentiles)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo parameter uncertainty for a drive cycle")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--drive-cycle", default="UDDS")
+    parser.add_argument("--fidelity", default="SPMe")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"🎲 Monte Carlo: {args.samples} {args.fidelity} samples of {args.drive_cycle} on {args.workers} workers")
+    print(f"   Uncertain parameters: {', '.join(DEFAULT_UNCERTAINTY)}")
+    summary = run_monte_carlo(args.samples, drive_cycle=args.drive_cycle, fidelity=args.fidelity,
+                              workers=args.workers, batch_size=args.batch_size, seed=args.seed)
+    bands = summary["bands"]
+    raw_bytes = args.samples * len(bands["time"]) * len(BAND_CHANNELS) * np.dtype(np.float32).itemsize
+    print(f"🏁 {summary['ok']} ok, {summary['failed']} failed in {summary['wall_seconds']:.1f} s "
+          f"({summary['samples_per_sec']:.1f} samples/sec) | reducer state {summary['reducer_bytes'] / 1024 ** 2:.2f} MiB "
+          f"vs {raw_bytes / 1024 ** 2:.2f} MiB of raw samples")
+    voltage = bands["voltage"]
+    for t in np.linspace(0, bands["time"][-1], 6).round():
+        i = int(np.searchsorted(bands["time"], t))
+        print(f"   - t={bands['time'][i]:5.0f} s: voltage p5 {voltage[5][i]:.4f} | p50 {voltage[50][i]:.4f} | "
+              f"p95 {voltage[95][i]:.4f} V ({voltage['count'][i]} runs)")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import itertools
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from simulation.battery_model import BatteryDigitalTwin, ambient_overrides
+
+# Long format: one row per time point, failed cases get a single row with null arrays
+SWEEP_SCHEMA = pa.schema([
+    ("case_id", pa.int32()),
+    ("fidelity", pa.string()),
+    ("drive_cycle", pa.string()),
+    ("parameter_set", pa.string()),
+    ("ambient_temperature_c", pa.float32()),
+    ("status", pa.string()),
+    ("error", pa.string()),
+    ("solve_seconds", pa.float32()),
+    ("time", pa.float64()),
+    ("voltage", pa.float32()),
+    ("current", pa.float32()),
+    ("temperature", pa.float32()),
+])
+
+# Twins built in this worker process, reused by every case that shares a build key
+_WORKER_TWINS = {}
+
+
+def build_cases(drive_cycles, parameter_sets, ambient_temperatures, fidelity="DFN"):
+    """Cartesian product of sweep axes as a list of case dicts"""
+    cases = []
+    for case_id, (parameter_set, ambient, drive_cycle) in enumerate(
+            itertools.product(parameter_sets, ambient_temperatures, drive_cycles)):
+        cases.append({
+            "case_id": case_id,
+            "fidelity": fidelity,
+            "drive_cycle": drive_cycle,
+            "parameter_set": parameter_set,
+            "ambient_temperature_c": float(ambient),
+        })
+    return cases
+
+
+def _worker_twin(case):
+    # PyBaMM bakes ambient temperature into the built experiment, so it is part of the key
+    key = (case["fidelity"], case["parameter_set"], case["ambient_temperature_c"])
+    if key not in _WORKER_TWINS:
+        _WORKER_TWINS[key] = BatteryDigitalTwin(
+            fidelity=case["fidelity"],
+            parameter_set=case["parameter_set"],
+            parameter_overrides=ambient_overrides(case["ambient_temperature_c"]),
+            verbose=False
+        )
+    return _WORKER_TWINS[key]
+
+
+def run_case(case):
+    """Solve one sweep case; errors are returned in the result instead of raised"""
+    start = perf_counter()
+    try:
+        results = _worker_twin(case).simulate_drive_cycle(case["drive_cycle"])
+        results = {name: np.asarray(values) for name, values in results.items()}
+        return dict(case, status="ok", error=None, solve_seconds=perf_counter() - start, results=results)
+    except Exception as e:
+        message = f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=3)}"
+        return dict(case, status="failed", error=message, solve_seconds=perf_counter() - start, results=None)
+
+
+def _result_table(result):
+    results = result["results"]
+    n = len(results["time"]) if results is not None else 1
+
+    def arr(name):
+        return results[name] if results is not None else [None]
+
+    return pa.table({
+        "case_id": pa.array([result["case_id"]] * n, pa.int32()),
+        "fidelity": pa.array([result["fidelity"]] * n, pa.string()),
+        "drive_cycle": pa.array([result["drive_cycle"]] * n, pa.string()),
+        "parameter_set": pa.array([result["parameter_set"]] * n, pa.string()),
+        "ambient_temperature_c": pa.array([result["ambient_temperature_c"]] * n, pa.float32()),
+        "status": pa.array([result["status"]] * n, pa.string()),
+        "error": pa.array([result["error"]] * n, pa.string()),
+        "solve_seconds": pa.array([result["solve_seconds"]] * n, pa.float32()),
+        "time": pa.array(arr("time"), pa.float64()),
+        "voltage": pa.array(arr("voltage"), pa.float32()),
+        "current": pa.array(arr("current"), pa.float32()),
+        "temperature": pa.array(arr("temperature"), pa.float32()),
+    }, schema=SWEEP_SCHEMA)
+
+
+def run_sweep(cases, output_path, workers=None, on_result=None):
+    """Run cases on a process pool and append each finished case to a Parquet file.
+
+    Every case is its own task, so all workers stay busy and each result is
+    written as soon as it finishes; workers still reuse built models through
+    their per-process twin cache. If a worker process dies, the pool is
+    recreated and the unfinished cases rerun one at a time until the case
+    that crashed it is found and recorded as failed; the rest then go back
+    to the full pool.
+    """
+    summary = {"ok": 0, "failed": 0, "cases": len(cases), "pool_restarts": 0}
+    pending = list(cases)
+    isolate = False
+    start = perf_counter()
+    with pq.ParquetWriter(output_path, SWEEP_SCHEMA, compression="zstd") as writer:
+        def record(result):
+            writer.write_table(_result_table(result))
+            summary[result["status"]] += 1
+            if on_result is not None:
+                on_result(result)
+
+        while pending:
+            unfinished = []
+            with ProcessPoolExecutor(max_workers=1 if isolate else workers) as pool:
+                if isolate:
+                    # One case in flight at a time, so a crash names its case
+                    for i, case in enumerate(pending):
+                        try:
+                            record(pool.submit(run_case, case).result())
+                        except BrokenProcessPool as e:
+                            record(dict(case, status="failed", error=f"Worker process crashed: {e}",
+                                        solve_seconds=None, results=None))
+                            unfinished = pending[i + 1:]
+                            break
+                    isolate = False
+                else:
+                    futures = {pool.submit(run_case, case): case for case in pending}
+                    for future in as_completed(futures):
+                        try:
+                            record(future.result())
+                        except BrokenProcessPool:
+                            unfinished.append(futures[future])
+                    isolate = bool(unfinished)
+            if unfinished:
+                summary["pool_restarts"] += 1
+            pending = unfinished
+    summary["wall_seconds"] = perf_counter() - start
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel drive-cycle x parameter-set x ambient sweep")
+    parser.add_argument("--drive-cycles", nargs="+", default=["UDDS", "CONSTANT"])
+    parser.add_argument("--parameter-sets", nargs="+", default=["Chen2020"])
+    parser.add_argument("--ambient", nargs="+", type=float, default=[0.0, 10.0, 25.0, 40.0],
+                        help="Ambient temperatures in °C")
+    parser.add_argument("--fidelity", default="DFN")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep_results.parquet")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.drive_cycles, args.parameter_sets, args.ambient, args.fidelity)
+    print(f"🧪 Parameter sweep: {len(cases)} cases on {args.workers} workers -> {args.output}")
+
+    def report(result):
+        icon = "✅" if result["status"] == "ok" else "❌"
+        print(f"   {icon} case {result['case_id']:>4}: {result['drive_cycle']} | {result['parameter_set']} | "
+              f"{result['ambient_temperature_c']:.1f}°C ({result['solve_seconds'] or 0:.2f} s)")
+
+    summary = run_sweep(cases, args.output, workers=args.workers, on_result=report)
+    print(f"🏁 Sweep finished in {summary['wall_seconds']:.1f} s: "
+          f"{summary['ok']} ok, {summary['failed']} failed of {summary['cases']} "
+          f"({summary['pool_restarts']} worker pool restarts)")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
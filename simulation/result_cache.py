@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import types
+
+import numpy as np
+import pybamm
+
+RESULT_KEYS = ("time", "voltage", "current", "temperature")
+# Bump when the meaning or shape of stored arrays changes
+RESULT_SCHEMA_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "simulation")
+
+
+def _stable_repr(value):
+    """Deterministic text for a parameter value (numbers, arrays, functions, nested tuples)"""
+    if isinstance(value, np.ndarray):
+        return f"array{value.shape}:{hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}"
+    if isinstance(value, (list, tuple)):
+        return "(" + ",".join(_stable_repr(item) for item in value) + ")"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k}:{_stable_repr(value[k])}" for k in sorted(value, key=str)) + "}"
+    if isinstance(value, types.FunctionType):
+        # Name alone is not enough: lambdas share one, and an edited body keeps it
+        closure = [cell.cell_contents for cell in value.__closure__ or ()]
+        return (f"{value.__module__}.{value.__qualname__}:{_code_digest(value.__code__)}"
+                f":{_stable_repr(value.__defaults__ or ())}:{_stable_repr(closure)}")
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+    return repr(value)
+
+
+def _code_digest(code):
+    """Hash of a code object's bytecode, constants and names; nested code objects are hashed too"""
+    digest = hashlib.sha256(code.co_code)
+    for const in code.co_consts:
+        digest.update((_code_digest(const) if isinstance(const, types.CodeType) else repr(const)).encode())
+    digest.update(repr(code.co_names).encode())
+    return digest.hexdigest()
+
+
+def simulation_key(model, parameter_values, experiment_steps, solver):
+    """Content hash of everything that determines a simulation result"""
+    payload = {
+        "schema": RESULT_SCHEMA_VERSION,
+        "pybamm": pybamm.__version__,
+        "model": type(model).__module__ + "." + type(model).__name__,
+        "model_name": model.name,
+        "options": _stable_repr(dict(model.options)),
+        "parameters": _stable_repr({key: value for key, value in parameter_values.items()}),
+        "experiment": list(experiment_steps),
+        "solver": {
+            "type": type(solver).__name__,
+            "rtol": getattr(solver, "rtol", None),
+            "atol": getattr(solver, "atol", None),
+        },
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SimulationResultCache:
+    """On-disk cache of simulation result arrays with LRU eviction.
+
+    Each entry is a directory named by the content hash holding one .npy file
+    per array, so hits are loaded memory-mapped instead of read into memory.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=256 * 1024 ** 2):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key):
+        """Return memory-mapped result arrays for key, or None on a miss"""
+        entry = self._entry_dir(key)
+        try:
+            results = {name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r") for name in RESULT_KEYS}
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        # The entry's mtime is its LRU timestamp
+        os.utime(entry)
+        self.hits += 1
+        return results
+
+    def store(self, key, results):
+        """Write result arrays for key, then evict least recently used entries over the size limit"""
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        for name in RESULT_KEYS:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(results[name], dtype=np.float64))
+        entry = self._entry_dir(key)
+        if os.path.isdir(entry):
+            shutil.rmtree(tmp_dir)
+        else:
+            os.replace(tmp_dir, entry)
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+            entries.append((os.stat(path).st_mtime, size, path))
+        return entries
+
+    def size_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        for _, _, path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries()),
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+        }
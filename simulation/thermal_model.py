@@ -0,0 +1,119 @@
+import time
+
+import numpy as np
+
+# The twin reports a pack at this model's steady state, so forecasts start from
+# the reading instead of relaxing away from it
+from simulation.fleet_simulation import PWM_COOLING_GAIN, THERMAL_TIME_CONSTANT_MIN, FleetSensorGenerator
+
+
+class LumpedThermalModel:
+    """One-node pack thermal model: dT/dt = heating * (1 - 0.4 * PWM) - (T - T_ambient) / tau.
+
+    Heating is the twin's calculate_temperature_effect in °C/min, so for
+    short horizons the slope matches predict_temperature's old linear jump.
+    With inputs held constant over a step the solution is an exact
+    exponential, so any step size is stable and the time to a limit is
+    solved for exactly instead of read off the grid.
+    """
+
+    def __init__(self, time_constant_min=THERMAL_TIME_CONSTANT_MIN):
+        self.time_constant_min = time_constant_min
+
+    def heating_rate(self, current, voltage, is_charging, load_percentage, pwm_percentage):
+        """Net heating in °C/min after PWM cooling; broadcasts over any array shapes"""
+        load_factor = np.asarray(load_percentage) / 100.0
+        heating = FleetSensorGenerator.temperature_effect(np.asarray(current), np.asarray(voltage),
+                                                          np.asarray(is_charging), load_factor)
+        return heating * (1.0 - np.asarray(pwm_percentage) / 100.0 * PWM_COOLING_GAIN)
+
+    def temperature_after(self, initial_temperature, heating_rate, ambient_temperature, minutes):
+        """Closed-form temperature after `minutes` of constant heating"""
+        equilibrium = ambient_temperature + heating_rate * self.time_constant_min
+        decay = np.exp(-np.asarray(minutes) / self.time_constant_min)
+        return equilibrium + (initial_temperature - equilibrium) * decay
+
+    def forecast(self, initial_temperature, current, voltage, is_charging, load_percentage, pwm_percentage,
+                 ambient_temperature, n_steps, dt_min=1.0, limit=85.0):
+        """Temperature trajectories for a batch of packs/scenarios.
+
+        Every input broadcasts against (..., n_steps): pass per-step profiles
+        with a trailing n_steps axis, or constants with a trailing axis of 1.
+        `initial_temperature` and `ambient_temperature` have the batch shape.
+        Returns the time grid, (..., n_steps + 1) trajectories and the
+        minutes until each trajectory first reaches `limit` (inf if never).
+        """
+        initial = np.asarray(initial_temperature, dtype=float)
+        ambient = np.asarray(ambient_temperature, dtype=float)[..., None]
+        heating = self.heating_rate(current, voltage, is_charging, load_percentage, pwm_percentage)
+        equilibrium = ambient + heating * self.time_constant_min
+        batch_shape = np.broadcast_shapes(initial.shape + (1,), equilibrium.shape)[:-1]
+        decay = np.exp(-dt_min / self.time_constant_min)
+
+        if equilibrium.shape[-1] == 1:
+            # Constant inputs: the whole trajectory in closed form
+            powers = decay ** np.arange(n_steps + 1)
+            trajectory = equilibrium + (initial[..., None] - equilibrium) * powers
+            equilibrium = np.broadcast_to(equilibrium, batch_shape + (n_steps,))
+        else:
+            # Time-major so every step writes one contiguous block
+            equilibrium = np.broadcast_to(equilibrium, batch_shape + (n_steps,))
+            steps = np.empty((n_steps + 1,) + batch_shape)
+            steps[0] = initial
+            for step in range(n_steps):
+                target = equilibrium[..., step]
+                steps[step + 1] = target + (steps[step] - target) * decay
+            trajectory = np.moveaxis(steps, 0, -1)
+
+        return {
+            'time_min': np.arange(n_steps + 1) * dt_min,
+            'temperature': trajectory,
+            'time_to_limit_min': self._time_to_limit(trajectory, equilibrium, dt_min, limit),
+        }
+
+    def _time_to_limit(self, trajectory, equilibrium, dt_min, limit):
+        reached = trajectory[..., 1:] >= limit
+        crossed = reached.any(axis=-1)
+        step = reached.argmax(axis=-1)
+        start = np.take_along_axis(trajectory, step[..., None], axis=-1)[..., 0]
+        target = np.take_along_axis(equilibrium, step[..., None], axis=-1)[..., 0]
+        # Exact crossing inside the step: limit = Teq + (T_n - Teq) * exp(-t / tau)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            within = -self.time_constant_min * np.log((limit - target) / (start - target))
+        minutes = np.where(crossed, step * dt_min + np.clip(within, 0, dt_min), np.inf)
+        return np.where(trajectory[..., 0] >= limit, 0.0, minutes)
+
+
+def benchmark_fleet_forecast(n_packs=10_000, n_scenarios=4, n_steps=60, seed=42):
+    """Time one forecast of every pack under several load scenarios"""
+    rng = np.random.default_rng(seed)
+    model = LumpedThermalModel()
+    temperature = rng.uniform(25, 45, n_packs)[:, None]
+    current = rng.uniform(25, 52, n_packs)[:, None, None]
+    load = np.array([25, 50, 75, 100])[:n_scenarios][None, :, None]
+    start = time.perf_counter()
+    result = model.forecast(temperature, current, 11.0, True, load, 75, 25.0, n_steps)
+    elapsed = time.perf_counter() - start
+    return {'n_packs': n_packs, 'n_scenarios': n_scenarios, 'n_steps': n_steps, 'elapsed_s': elapsed,
+            'trajectories_per_sec': n_packs * n_scenarios / elapsed, 'result': result}
+
+
+if __name__ == "__main__":
+    print("🌡️ Lumped Thermal Forecast")
+    print("=" * 50)
+    model = LumpedThermalModel()
+    # One pack under four load scenarios, plus a ramping current profile
+    current = np.full((5, 60), 30.0)
+    current[4] = np.linspace(30, 60, 60)
+    result = model.forecast(np.full(5, 35.0), current, 11.0, True, np.array([25, 50, 75, 100, 100])[:, None],
+                            50, 25.0, 60, limit=40.0)
+    for name, trajectory, ttl in zip(["load 25%", "load 50%", "load 75%", "load 100%", "ramp 30→60 A"],
+                                     result['temperature'], result['time_to_limit_min']):
+        print(f"   - {name:<13} 5 min {trajectory[5]:5.1f}°C | 60 min {trajectory[-1]:5.1f}°C | "
+              f"time to 40°C: {'never' if np.isinf(ttl) else f'{ttl:.1f} min'}")
+
+    print("\n⏱️ Fleet forecast (60 one-minute steps):")
+    for n_packs in [100, 10_000, 100_000]:
+        bench = benchmark_fleet_forecast(n_packs)
+        print(f"   - {n_packs:>7,} packs x {bench['n_scenarios']} scenarios: {bench['elapsed_s'] * 1000:8.2f} ms "
+              f"({bench['trajectories_per_sec']:,.0f} trajectories/sec)")
@@ -0,0 +1,197 @@
+import argparse
+import os
+from time import perf_counter
+
+import numpy as np
+
+# Cell-level grid; currents use PyBaMM's sign (positive discharges), 5 A = 1C for Chen2020
+SOC_GRID = np.linspace(0.0, 1.0, 41)
+CURRENT_GRID = np.array([-10.0, -5.0, -2.5, -1.0, 0.0, 1.0, 2.5, 5.0, 10.0])
+TEMPERATURE_GRID = np.array([0.0, 10.0, 25.0, 40.0])
+# The 0 A column is the mean of a slow charge and discharge, so their overpotentials cancel
+ZERO_CURRENT_PROBE = 0.05
+
+# The dashboard's 9-13 V pack is 3 cells in series; 5 in parallel puts 40 A at 1.6C per cell
+PACK_SERIES = 3
+PACK_PARALLEL = 5
+
+ARTIFACT_VERSION = 1
+DEFAULT_SURROGATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts", "voltage_surrogate.npz")
+
+
+def _bracket(grid, values):
+    """Lower grid index and interpolation weight per value, clamped to the grid"""
+    values = np.clip(values, grid[0], grid[-1])
+    index = np.clip(np.searchsorted(grid, values, side='right') - 1, 0, len(grid) - 2)
+    weight = (values - grid[index]) / (grid[index + 1] - grid[index])
+    return index, weight
+
+
+class VoltageSurrogate:
+    """Terminal voltage table over SOC x current x temperature, built offline from PyBaMM.
+
+    Evaluation is vectorized trilinear interpolation, so one call prices a
+    whole fleet; queries outside the grid are clamped to its edges.
+    """
+
+    def __init__(self, table, soc_grid=SOC_GRID, current_grid=CURRENT_GRID, temperature_grid=TEMPERATURE_GRID,
+                 metadata=None):
+        self.table = np.asarray(table, dtype=np.float32)
+        self.soc_grid = np.asarray(soc_grid, dtype=float)
+        self.current_grid = np.asarray(current_grid, dtype=float)
+        self.temperature_grid = np.asarray(temperature_grid, dtype=float)
+        self.metadata = dict(metadata or {})
+
+    @classmethod
+    def build(cls, battery, soc_grid=SOC_GRID, current_grid=CURRENT_GRID, temperature_grid=TEMPERATURE_GRID,
+              verbose=True):
+        """One constant-current PyBaMM solve per (current, temperature) covers the whole SOC axis"""
+        table = np.empty((len(soc_grid), len(current_grid), len(temperature_grid)), dtype=np.float32)
+        start = perf_counter()
+        for k, temperature in enumerate(temperature_grid):
+            for j, current in enumerate(current_grid):
+                if current == 0:
+                    curves = [battery.simulate_constant_current(sign * ZERO_CURRENT_PROBE, temperature)
+                              for sign in (1, -1)]
+                    table[:, j, k] = np.mean([_voltage_on_grid(curve, soc_grid) for curve in curves], axis=0)
+                else:
+                    table[:, j, k] = _voltage_on_grid(battery.simulate_constant_current(current, temperature), soc_grid)
+            if verbose:
+                print(f"   - {temperature:5.1f}°C: {len(current_grid)} currents done ({perf_counter() - start:.1f} s)")
+        metadata = {'fidelity': battery.fidelity, 'parameter_set': battery.parameter_set,
+                    'build_seconds': perf_counter() - start}
+        return cls(table, soc_grid, current_grid, temperature_grid, metadata)
+
+    def cell_voltage(self, soc, current, temperature):
+        """Cell voltage for SOC (0-1), cell current (A, positive discharges) and temperature (°C)"""
+        soc, current, temperature = np.broadcast_arrays(np.asarray(soc, dtype=float), np.asarray(current, dtype=float),
+                                                        np.asarray(temperature, dtype=float))
+        i, wi = _bracket(self.soc_grid, soc)
+        j, wj = _bracket(self.current_grid, current)
+        k, wk = _bracket(self.temperature_grid, temperature)
+        table = self.table
+        voltage = 0.0
+        for di, fi in ((0, 1 - wi), (1, wi)):
+            for dj, fj in ((0, 1 - wj), (1, wj)):
+                for dk, fk in ((0, 1 - wk), (1, wk)):
+                    voltage = voltage + fi * fj * fk * table[i + di, j + dj, k + dk]
+        return voltage
+
+    def pack_voltage(self, soc_percent, pack_current, temperature, n_series=PACK_SERIES, n_parallel=PACK_PARALLEL):
+        """Pack voltage in the twin's units: SOC in %, current positive while charging"""
+        return n_series * self.cell_voltage(np.asarray(soc_percent) / 100.0, -np.asarray(pack_current) / n_parallel,
+                                            temperature)
+
+    def save(self, path=DEFAULT_SURROGATE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, artifact_version=ARTIFACT_VERSION, table=self.table, soc_grid=self.soc_grid,
+                 current_grid=self.current_grid, temperature_grid=self.temperature_grid,
+                 fidelity=self.metadata.get('fidelity', ''), parameter_set=self.metadata.get('parameter_set', ''))
+        os.replace(tmp_path, path)
+        print(f"💾 Voltage surrogate saved to {path} ({os.path.getsize(path) / 1024:.1f} KiB)")
+
+    @classmethod
+    def load(cls, path=DEFAULT_SURROGATE_PATH):
+        with np.load(path) as artifact:
+            if int(artifact['artifact_version']) != ARTIFACT_VERSION:
+                raise ValueError(f"Unsupported artifact version {int(artifact['artifact_version'])}, "
+                                 f"expected {ARTIFACT_VERSION}")
+            return cls(artifact['table'], artifact['soc_grid'], artifact['current_grid'], artifact['temperature_grid'],
+                       {'fidelity': str(artifact['fidelity']), 'parameter_set': str(artifact['parameter_set'])})
+
+    @classmethod
+    def load_or_build(cls, path=DEFAULT_SURROGATE_PATH, fidelity="DFN"):
+        """Load the saved table, running the PyBaMM grid only on the first cold start"""
+        if os.path.exists(path):
+            return cls.load(path)
+        from simulation.battery_model import BatteryDigitalTwin
+        surrogate = cls.build(BatteryDigitalTwin(fidelity=fidelity, verbose=False))
+        surrogate.save(path)
+        return surrogate
+
+
+def _voltage_on_grid(curve, soc_grid):
+    # np.interp needs increasing SOC and holds the end values past the cut-off
+    order = np.argsort(curve["soc"])
+    return np.interp(soc_grid, curve["soc"][order], curve["voltage"][order])
+
+
+def validate(surrogate, battery, n_cases=12, seed=0):
+    """Error against fresh PyBaMM solves at random off-grid currents and temperatures, plus speed-up"""
+    rng = np.random.default_rng(seed)
+    errors = []
+    solve_seconds = 0.0
+    eval_seconds = 0.0
+    n_points = 0
+    for _ in range(n_cases):
+        current = rng.uniform(-8, 8)
+        temperature = rng.uniform(surrogate.temperature_grid[0], surrogate.temperature_grid[-1])
+        start = perf_counter()
+        reference = battery.simulate_constant_current(current, temperature)
+        solve_seconds += perf_counter() - start
+        # Compare inside the SOC span the table saw, away from the cut-off knee
+        inside = (reference["soc"] > 0.1) & (reference["soc"] < 0.95)
+        start = perf_counter()
+        predicted = surrogate.cell_voltage(reference["soc"][inside], current, temperature)
+        eval_seconds += perf_counter() - start
+        errors.append(predicted - reference["voltage"][inside])
+        n_points += inside.sum()
+    errors = np.concatenate(errors)
+    return {
+        'cases': n_cases,
+        'points': int(n_points),
+        'rmse_mv': float(np.sqrt(np.mean(errors ** 2)) * 1000),
+        'max_error_mv': float(np.abs(errors).max() * 1000),
+        'pybamm_seconds_per_case': solve_seconds / n_cases,
+        'surrogate_seconds_per_case': eval_seconds / n_cases,
+        'speedup': solve_seconds / eval_seconds,
+    }
+
+
+def benchmark_fleet_evaluation(surrogate, n_packs=10_000, repeats=20, seed=0):
+    """Seconds per tick to price every pack of a fleet"""
+    rng = np.random.default_rng(seed)
+    soc = rng.uniform(20, 95, n_packs)
+    current = rng.uniform(-40, 40, n_packs)
+    temperature = rng.uniform(15, 45, n_packs)
+    start = perf_counter()
+    for _ in range(repeats):
+        surrogate.pack_voltage(soc, current, temperature)
+    return (perf_counter() - start) / repeats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and validate the PyBaMM voltage surrogate")
+    parser.add_argument("--fidelity", default="DFN", help="BatteryDigitalTwin fidelity used as the reference")
+    parser.add_argument("--output", default=DEFAULT_SURROGATE_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the table exists")
+    parser.add_argument("--cases", type=int, default=12, help="Random off-grid validation solves")
+    args = parser.parse_args(argv)
+
+    from simulation.battery_model import BatteryDigitalTwin
+
+    print("🔬 PyBaMM Voltage Surrogate")
+    print("=" * 50)
+    battery = BatteryDigitalTwin(fidelity=args.fidelity, verbose=False)
+    if args.rebuild or not os.path.exists(args.output):
+        print(f"🏗️ Building {len(SOC_GRID)} x {len(CURRENT_GRID)} x {len(TEMPERATURE_GRID)} table from {args.fidelity}...")
+        surrogate = VoltageSurrogate.build(battery)
+        surrogate.save(args.output)
+    else:
+        surrogate = VoltageSurrogate.load(args.output)
+        print(f"📂 Loaded table from {args.output}")
+
+    report = validate(surrogate, battery, n_cases=args.cases)
+    print(f"📊 Accuracy vs {args.fidelity} on {report['cases']} off-grid runs ({report['points']:,} points):")
+    print(f"   - RMSE {report['rmse_mv']:.1f} mV | max error {report['max_error_mv']:.1f} mV")
+    print(f"   - PyBaMM {report['pybamm_seconds_per_case'] * 1000:.1f} ms/run (warm) vs surrogate "
+          f"{report['surrogate_seconds_per_case'] * 1e6:.1f} µs → {report['speedup']:,.0f}x faster")
+    for n_packs in [1, 1_000, 100_000]:
+        seconds = benchmark_fleet_evaluation(surrogate, n_packs)
+        print(f"   - {n_packs:>7,} packs per tick: {seconds * 1000:8.3f} ms")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import time
+from collections import deque
 from datetime import datetime, timedelta
-import base64
-import io
+import os
+import functools
+import uuid
 
-st.set_page_config(
-    page_title="EV Digital Twin - Team TIGONS",
-    page_icon="🔋",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from dashboard.telemetry_history import TELEMETRY_COLUMNS, TelemetryHistory
+from dashboard.twin_engine import TwinEngine
+from dashboard.cosim_worker import CoSimulationWorker
+from dashboard.instrumentation import DEFAULT_DUMP_PATH, StageProfiler
+from dashboard.downsampling import downsample_frame
+from dashboard.rolling_stats import RollingStats, ThresholdDetector
+from dashboard.export import DEFAULT_EXPORT_DIR, EXPORT_MIME_TYPES, PARQUET_COMPRESSIONS, export_history
+from simulation.fault_simulation import FAULT_TYPES, FaultEngine, FaultScenario
+from simulation.thermal_model import LumpedThermalModel
 
 # PROFESSIONAL CSS
-st.markdown("""
+PROFESSIONAL_CSS = """
 <style>
     .main-header {
         font-size: 2.8rem !important;
@@ -100,23 +104,71 @@ st.markdown("""
         margin: 10px 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def setup_page():
+    """Page config and CSS; called from main() so importing this module stays headless"""
+    st.set_page_config(
+        page_title="EV Digital Twin - Team TIGONS",
+        page_icon="🔋",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(PROFESSIONAL_CSS, unsafe_allow_html=True)
+
+def session_id():
+    """Random id per browser session, for per-session files"""
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex[:12]
+    return st.session_state.session_id
+
+def session_profiler():
+    """This session's StageProfiler; each session turns its own diagnostics on and off"""
+    if 'profiler' not in st.session_state:
+        st.session_state.profiler = StageProfiler()
+    return st.session_state.profiler
+
+def timed_stage(name):
+    """Time every call of a page function as one stage of the calling session's profiler"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with session_profiler().span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+FAULT_CHANNELS = ('voltage', 'current', 'temperature')
+FAULT_CAMPAIGN_STEPS = 100_000
+FAULT_MEAN_INTERVAL = 10
+ROLLING_WINDOW = 50
+# Simulated seconds the PyBaMM co-simulation advances per twin tick
+PHYSICS_STEP_SECONDS = 10.0
 
 class EVDigitalTwin:
     def __init__(self):
-        self.event_log = []
+        # Appended from both the engine thread and the script thread; deque appends are atomic
+        self.event_log = deque(maxlen=20)
         self.fault_injected = False
+        # Scripted FaultScenario to replay; a seeded random campaign is drawn when None
+        self.fault_scenario = None
+        self.fault_seed = None
+        self.fault_step = 0
+        self._fault_engine = None
         self.start_time = datetime.now()
         
         # DEFAULT VALUES - User will change these
         self.voltage_range = [9.0, 13.0]
-        self.fault_limits = {'voltage': 10.5, 'temperature': 85, 'current': 4.0}
+        self.fault_limits = {'voltage': 8.5, 'temperature': 85, 'current': 60.0}
         self.safe_limits = {'voltage_min': 9.0, 'voltage_max': 13.0, 'temp_max': 60}
         self.load_percentage = 50
         self.pwm_percentage = 75
         self.base_temperature = 25
         self.noise_level = 0.1
         self.simulation_steps = 100
+        self.thermal_model = LumpedThermalModel()
+        # Optional simulation.voltage_surrogate.VoltageSurrogate replacing the linear SOC->voltage formula
+        self.voltage_surrogate = None
         
         self.log_event("Digital Twin Initialized", "SUCCESS")
     
@@ -140,8 +192,6 @@ class EVDigitalTwin:
             'event': event,
             'status': status
         })
-        if len(self.event_log) > 20:
-            self.event_log = self.event_log[-20:]
     
     def calculate_temperature_effect(self, current, voltage, is_charging, load_factor):
         """Calculate temperature based on USER INPUT parameters"""
@@ -153,7 +203,7 @@ class EVDigitalTwin:
         total_heating = i2r_heating + voltage_heating + charging_heating
         return total_heating
     
-    def predict_temperature(self, current_temp, current, voltage, is_charging):
+    def predict_temperature(self, current_temp, current, voltage, is_charging, minutes=5):
         """Predict temperature based on USER INPUT parameters"""
         load_factor = self.load_percentage / 100.0
         cooling_factor = self.pwm_percentage / 100.0
@@ -161,8 +211,23 @@ class EVDigitalTwin:
         heating_rate = self.calculate_temperature_effect(current, voltage, is_charging, load_factor)
         effective_heating = heating_rate * (1.0 - cooling_factor * 0.4)
         
-        predicted_temp = current_temp + effective_heating * 5
-        return min(85, max(15, predicted_temp))
+        # Lumped thermal model: heats at effective_heating °C/min, relaxing toward ambient
+        predicted_temp = self.thermal_model.temperature_after(current_temp, effective_heating,
+                                                              self.base_temperature, minutes)
+        return min(85, max(15, float(predicted_temp)))
+    
+    def forecast_temperature(self, current_temp, current, voltage, is_charging, horizon_min=60, dt_min=1.0):
+        """Temperature trajectory over the horizon and minutes until the fault limit.
+        
+        `current` and `voltage` may be scalars or per-step profiles of length horizon_min / dt_min.
+        """
+        n_steps = int(np.ceil(horizon_min / dt_min))
+        return self.thermal_model.forecast(
+            current_temp, np.asarray(current, dtype=float).reshape(-1)[None, :],
+            np.asarray(voltage, dtype=float).reshape(-1)[None, :], is_charging,
+            self.load_percentage, self.pwm_percentage, self.base_temperature, n_steps,
+            dt_min=dt_min, limit=self.fault_limits['temperature']
+        )
     
     def predict_discharge_time(self, soc, current):
         """Predict remaining discharge time"""
@@ -178,24 +243,29 @@ class EVDigitalTwin:
         return f"{minutes_left:.1f} mins"
     
     def simulate_fault(self, sensor_data):
-        """Simulate various fault scenarios"""
+        """Apply the scheduled fault scenario to this tick's readings"""
         if not self.fault_injected:
             return sensor_data
         
-        fault_type = np.random.choice(['voltage_drop', 'thermal_spike', 'sensor_failure', 'over_current'])
-        
-        if fault_type == 'voltage_drop':
-            sensor_data['voltage'] = self.fault_limits['voltage'] - np.random.uniform(0.5, 2.0)
-            self.log_event("⚠️ VOLTAGE DROP DETECTED", "DANGER")
-        elif fault_type == 'thermal_spike':
-            sensor_data['temperature'] = self.fault_limits['temperature'] + np.random.uniform(5, 15)
-            self.log_event("🔥 THERMAL SPIKE DETECTED", "DANGER")
-        elif fault_type == 'sensor_failure':
-            sensor_data['current'] = 0
-            self.log_event("🔧 CURRENT SENSOR FAILURE", "WARNING")
-        elif fault_type == 'over_current':
-            sensor_data['current'] = self.fault_limits['current'] + np.random.uniform(1, 3)
-            self.log_event("⚡ OVER-CURRENT DETECTED", "DANGER")
+        if self._fault_engine is None or self.fault_step >= FAULT_CAMPAIGN_STEPS:
+            # An empty scripted scenario is falsy, but still means "no faults"
+            scenario = self.fault_scenario
+            if scenario is None:
+                scenario = FaultScenario.random(
+                    FAULT_CAMPAIGN_STEPS, mean_interval=FAULT_MEAN_INTERVAL, seed=self.fault_seed
+                )
+            self._fault_engine = FaultEngine(scenario)
+            self.fault_step = 0
+        # Follow the user's fault limits as they change
+        self._fault_engine.fault_limits = self.fault_limits
+        
+        if self._fault_engine.has_work(self.fault_step):
+            readings = {channel: np.array([sensor_data[channel]], dtype=float) for channel in FAULT_CHANNELS}
+            for event in self._fault_engine.apply(self.fault_step, readings):
+                self.log_event(FAULT_TYPES[event['type']][3], FAULT_TYPES[event['type']][4])
+            for channel, values in readings.items():
+                sensor_data[channel] = round(float(values[0]), 3)
+        self.fault_step += 1
         
         return sensor_data
 
@@ -221,14 +291,19 @@ def generate_sensor_data(previous_soc=75, is_charging=True, digital_twin=None):
         new_soc = max(15, previous_soc - discharge_rate)
         current = (-20 - load_factor * 20 - np.random.uniform(0, 15))
         voltage = base_voltage_range[0] + (new_soc/100) * (base_voltage_range[1] - base_voltage_range[0]) / 1.5
+
+    if digital_twin.voltage_surrogate is not None:
+        voltage = float(digital_twin.voltage_surrogate.pack_voltage(new_soc, current, base_temp))
     
     # APPLY USER-DEFINED NOISE
     voltage += np.random.normal(0, noise_level)
     current += np.random.normal(0, noise_level * 0.5)
     
-    # TEMPERATURE BASED ON USER INPUTS
-    temp_increase = digital_twin.calculate_temperature_effect(current, voltage, is_charging, load_factor)
-    temperature = base_temp + temp_increase * 8 + np.random.uniform(-1, 1)
+    # TEMPERATURE BASED ON USER INPUTS: the thermal model's steady state after PWM cooling
+    thermal_model = digital_twin.thermal_model
+    temp_increase = float(thermal_model.heating_rate(current, voltage, is_charging, digital_twin.load_percentage,
+                                                     digital_twin.pwm_percentage))
+    temperature = base_temp + temp_increase * thermal_model.time_constant_min + np.random.uniform(-1, 1)
     
     health_degradation = (100 - new_soc) * 0.05 + max(0, temperature - 30) * 0.15 + load_factor * 0.1
     health_score = max(45, 97 - health_degradation)
@@ -253,20 +328,6 @@ def generate_sensor_data(previous_soc=75, is_charging=True, digital_twin=None):
         'user_pwm': digital_twin.pwm_percentage
     }
 
-def create_csv_download(df, filename):
-    """Create CSV download link"""
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}" style="background: #4CAF50; color: white; padding: 10px 15px; text-decoration: none; border-radius: 5px; display: inline-block;">📥 {filename}</a>'
-    return href
-
-def create_pdf_download(report_text, filename):
-    """Create PROPER PDF download link"""
-    # Create a text file that can be saved as PDF
-    b64 = base64.b64encode(report_text.encode()).decode()
-    href = f'<a href="data:text/plain;base64,{b64}" download="{filename}" style="background: #dc3545; color: white; padding: 10px 15px; text-decoration: none; border-radius: 5px; display: inline-block; margin: 5px;">📄 {filename}</a>'
-    return href
-
 def create_pdf_report(sensor_data, digital_twin):
     """Create a comprehensive PDF report"""
     report = f"""
@@ -381,8 +442,8 @@ def show_user_input_section(digital_twin):
             
             fault_voltage = st.slider(
                 "**Voltage Fault Limit (V)**", 
-                8.0, 12.0, digital_twin.fault_limits['voltage'], 0.1,
-                help="VOLTAGE FAULT: Trigger fault below this voltage"
+                6.0, 12.0, digital_twin.fault_limits['voltage'], 0.1,
+                help="VOLTAGE FAULT: Trigger fault below this voltage (keep it under Min Voltage)"
             )
             
             fault_temperature = st.slider(
@@ -393,8 +454,8 @@ def show_user_input_section(digital_twin):
             
             fault_current = st.slider(
                 "**Current Fault Limit (A)**", 
-                2.0, 6.0, digital_twin.fault_limits['current'], 0.1,
-                help="CURRENT FAULT: Trigger fault above this current"
+                30.0, 100.0, digital_twin.fault_limits['current'], 1.0,
+                help="CURRENT FAULT: Trigger fault when charge or discharge current exceeds this"
             )
         
         st.markdown('</div>', unsafe_allow_html=True)
@@ -410,6 +471,7 @@ def show_user_input_section(digital_twin):
             st.success("✅ User parameters applied successfully!")
             st.rerun()
 
+@timed_stage("live.load_temperature_analysis")
 def show_load_temperature_analysis(sensor_data, digital_twin):
     """Show detailed load-temperature relationship"""
     st.markdown("### 🔥 LOAD-TEMPERATURE ANALYSIS")
@@ -448,6 +510,7 @@ def show_load_temperature_analysis(sensor_data, digital_twin):
     
     st.markdown(f'<div class="{load_class}" style="text-align: center; padding: 15px; margin: 10px 0; font-size: 16px; font-weight: bold;">{load_status} | User Load: {digital_twin.load_percentage}% | Current Temp: {sensor_data["temperature"]}°C</div>', unsafe_allow_html=True)
 
+@timed_stage("live.mobile_view")
 def show_mobile_view(sensor_data, digital_twin):
     """Show mobile-optimized view for field engineers"""
     st.markdown("### 📱 MOBILE VIEW - FIELD ENGINEER DASHBOARD")
@@ -543,87 +606,89 @@ def show_mobile_view(sensor_data, digital_twin):
             if st.button("📊 Parameters", use_container_width=True):
                 st.info("Adjust parameters in sidebar")
 
-def main():
-    # Initialize digital twin
-    if 'digital_twin' not in st.session_state:
-        st.session_state.digital_twin = EVDigitalTwin()
+def twin_step(engine):
+    """One simulation tick: generate sensor data from USER INPUT, apply faults, check limits"""
+    state = engine.state
+    profiler = state['profiler']
+    digital_twin = state['digital_twin']
+    with profiler.span("engine.generate"):
+        sensor_data = generate_sensor_data(state['last_soc'], state['is_charging'], digital_twin)
+    state['last_soc'] = sensor_data['soc']
     
-    # Initialize session state
-    if 'sensor_data' not in st.session_state:
-        st.session_state.sensor_data = []
-        st.session_state.last_soc = 65
-        st.session_state.is_charging = True
-        st.session_state.cycle_count = 0
-        st.session_state.show_compare = False
-        st.session_state.show_mobile = False
-
-    # PROFESSIONAL HEADER
-    st.markdown('<h1 class="main-header">🔋 EV DIGITAL TWIN PLATFORM</h1>', unsafe_allow_html=True)
-    st.markdown('<h3 style="text-align: center; color: #5c6bc0; margin-bottom: 1rem;">🐅 Team TIGONS | KPIT Sparkle 2025</h3>', unsafe_allow_html=True)
+    # Apply fault simulation if enabled
+    with profiler.span("engine.fault"):
+        sensor_data = digital_twin.simulate_fault(sensor_data)
     
-    # ==================== USER INPUT SECTION ====================
-    show_user_input_section(st.session_state.digital_twin)
+    # Rolling statistics and limit checks, updated incrementally every tick
+    with profiler.span("engine.monitor"):
+        state['rolling_stats'].update_sample(sensor_data)
+        detector = state['limit_detector']
+        detector.set_limits(digital_twin.fault_limits, digital_twin.safe_limits)
+        for message, _, _, _, status in detector.check_sample(sensor_data):
+            digital_twin.log_event(message, status)
     
-    # ==================== SIDEBAR - VIEW CONTROLS ====================
-    with st.sidebar:
-        st.markdown("### 🎮 VIEW CONTROLS")
-        
-        # Operation Mode
-        mode = st.radio(
-            "**OPERATION MODE:**",
-            ["⚡ FAST CHARGE", "🔋 SMART DISCHARGE", "🔄 AUTO CYCLE"],
-            index=0
-        )
-        new_charging_state = "CHARGE" in mode
-        if new_charging_state != st.session_state.is_charging:
-            st.session_state.is_charging = new_charging_state
-            event = "Charging Started" if new_charging_state else "Discharging Started"
-            st.session_state.digital_twin.log_event(event, "SUCCESS")
-        
-        st.markdown("---")
-        st.markdown("### 🎯 VIEW MODES")
-        st.session_state.show_compare = st.checkbox("🔀 COMPARE MODE")
-        st.session_state.show_mobile = st.checkbox("📱 MOBILE VIEW", help="Optimized view for field engineers")
-        
-        st.session_state.digital_twin.fault_injected = st.checkbox("⚠️ INJECT FAULT SCENARIOS")
-        
-        st.markdown("---")
-        st.markdown("### 📊 SYSTEM STATUS")
-        
-        if st.session_state.sensor_data:
-            latest = st.session_state.sensor_data[-1]
-            st.metric("Uptime", f"{(datetime.now() - st.session_state.digital_twin.start_time).seconds // 60} min")
-            st.metric("Data Points", len(st.session_state.sensor_data))
-            st.metric("Events Logged", len(st.session_state.digital_twin.event_log))
+    # Optional PyBaMM cell driven by this tick's pack current; it builds and solves on its own
+    # thread, so a slow or failing solve never holds the engine lock
+    if state.get('physics_enabled'):
+        with profiler.span("engine.physics"):
+            state['physics'].submit({'current': sensor_data['current'], 'soc': sensor_data['soc'],
+                                     'ambient': digital_twin.base_temperature})
+    return sensor_data
 
-    # ==================== MAIN DASHBOARD ====================
-    
-    # Generate live data with USER INPUT parameters
-    sensor_data = generate_sensor_data(
-        st.session_state.last_soc, 
-        st.session_state.is_charging,
-        st.session_state.digital_twin
+@st.cache_resource(show_spinner="⚡ Loading the voltage surrogate (the first run builds it from PyBaMM, which takes minutes)...")
+def load_voltage_surrogate():
+    """Read-only surrogate table shared by every session"""
+    from simulation.voltage_surrogate import VoltageSurrogate
+    return VoltageSurrogate.load_or_build()
+
+def build_physics(request):
+    """Co-simulated cell starting from the twin's SOC; imports and builds PyBaMM on first use"""
+    from simulation.battery_model import BatteryDigitalTwin
+    return BatteryDigitalTwin(fidelity="SPMe", verbose=False).start_cosimulation(
+        initial_soc=request['soc'] / 100, ambient_celsius=request['ambient']
     )
-    st.session_state.last_soc = sensor_data['soc']
-    
-    # Apply fault simulation if enabled
-    sensor_data = st.session_state.digital_twin.simulate_fault(sensor_data)
-    
-    st.session_state.sensor_data.append(sensor_data)
-    st.session_state.cycle_count += 1
-    
-    # Manage data history based on USER INPUT
-    if len(st.session_state.sensor_data) > st.session_state.digital_twin.simulation_steps:
-        st.session_state.sensor_data = st.session_state.sensor_data[-st.session_state.digital_twin.simulation_steps:]
+
+def step_physics(cosimulation, request):
+    """Advance the co-simulated cell one step from its last state"""
+    from simulation.voltage_surrogate import PACK_PARALLEL, PACK_SERIES
+    # Pack current is positive while charging; PyBaMM's cell current is positive while discharging
+    cell = cosimulation.step(-request['current'] / PACK_PARALLEL, PHYSICS_STEP_SECONDS)
+    return dict(cell, pack_voltage=cell['voltage'] * PACK_SERIES, step_ms=cosimulation.step_times[-1] * 1000)
+
+def show_diagnostics_panel():
+    """Rolling p50/p95/p99 of every instrumented stage"""
+    st.markdown('<div class="section-header">🩺 DIAGNOSTICS - STAGE TIMINGS</div>', unsafe_allow_html=True)
+    profiler = session_profiler()
+    summary = profiler.summary()
+    if summary:
+        st.dataframe(pd.DataFrame.from_dict(summary, orient='index').round(3), use_container_width=True)
+    path = os.path.join(os.path.dirname(DEFAULT_DUMP_PATH), f"stage_timings_{session_id()}.json")
+    dump_path = profiler.dump_if_due(path)
+    if st.button("💾 DUMP TIMINGS"):
+        dump_path = profiler.dump(path)
+    if dump_path:
+        st.caption(f"Timings written to {dump_path}")
+
+@timed_stage("live.total")
+def show_live_dashboard(engine):
+    """Everything that changes with the simulation; refreshed on its own timer"""
+    lap = session_profiler().stopwatch("live.")
+    digital_twin = engine.state['digital_twin']
+    sensor_data, _ = engine.snapshot()
+    error = engine.last_error
+    if error is not None:
+        st.error(f"⚠️ **SIMULATION ENGINE ERROR** - {type(error).__name__}: {error}\n\n"
+                 f"Showing the last good sample ({engine.error_count} failed ticks, see the server log)")
+    lap("snapshot")
     
     # ==================== SPECIAL VIEW MODES ====================
     
     if st.session_state.show_compare:
         st.markdown('<div class="compare-mode">', unsafe_allow_html=True)
         simulated_data = generate_sensor_data(
-            st.session_state.last_soc - 2,
-            st.session_state.is_charging,
-            st.session_state.digital_twin
+            sensor_data['soc'] - 2,
+            sensor_data['is_charging'],
+            digital_twin
         )
         
         col1, col2 = st.columns(2)
@@ -642,17 +707,19 @@ def main():
                      f"{simulated_data['current'] - sensor_data['current']:+.2f}A")
         
         st.markdown('</div>', unsafe_allow_html=True)
+    lap("compare")
     
     # ==================== MOBILE VIEW ====================
     if st.session_state.show_mobile:
-        show_mobile_view(sensor_data, st.session_state.digital_twin)
+        show_mobile_view(sensor_data, digital_twin)
+    lap("mobile")
     
     # ==================== DESKTOP VIEW ====================
     if not st.session_state.show_mobile:
         st.markdown('<div class="section-header">🎯 SIMULATION RESULTS</div>', unsafe_allow_html=True)
         
         # LOAD-TEMPERATURE ANALYSIS
-        show_load_temperature_analysis(sensor_data, st.session_state.digital_twin)
+        show_load_temperature_analysis(sensor_data, digital_twin)
         
         col1, col2, col3 = st.columns([2, 1, 1])
         
@@ -671,8 +738,8 @@ def main():
                     </div>
                 </div>
                 <p><strong>User Parameters Applied:</strong></p>
-                <p>• Load: {st.session_state.digital_twin.load_percentage}% | PWM: {st.session_state.digital_twin.pwm_percentage}%</p>
-                <p>• Base Temp: {st.session_state.digital_twin.base_temperature}°C | Noise: {st.session_state.digital_twin.noise_level}</p>
+                <p>• Load: {digital_twin.load_percentage}% | PWM: {digital_twin.pwm_percentage}%</p>
+                <p>• Base Temp: {digital_twin.base_temperature}°C | Noise: {digital_twin.noise_level}</p>
             </div>
             """, unsafe_allow_html=True)
         
@@ -680,10 +747,13 @@ def main():
             # PREDICTIVE INSIGHTS
             st.markdown("### 🤖 PREDICTIVE INSIGHTS")
             
-            predicted_temp = st.session_state.digital_twin.predict_temperature(
+            forecast = digital_twin.forecast_temperature(
                 sensor_data['temperature'], sensor_data['current'], 
-                sensor_data['voltage'], sensor_data['is_charging']
+                sensor_data['voltage'], sensor_data['is_charging'], horizon_min=60
             )
+            predicted_temp = min(85, max(15, forecast['temperature'][0, 5]))
+            time_to_limit = forecast['time_to_limit_min'][0]
+            limit_text = "> 60 min" if np.isinf(time_to_limit) else f"{time_to_limit:.1f} min"
             
             st.markdown(f"""
             <div class="prediction-card">
@@ -692,10 +762,11 @@ def main():
                 <div style="color: {'#90EE90' if predicted_temp < 40 else '#FFB6C1'}">
                     {'✅ Safe' if predicted_temp < 40 else '⚠️ Monitor'}
                 </div>
+                <div>⏳ Time to {digital_twin.fault_limits['temperature']}°C limit: <strong>{limit_text}</strong></div>
             </div>
             """, unsafe_allow_html=True)
             
-            discharge_time = st.session_state.digital_twin.predict_discharge_time(
+            discharge_time = digital_twin.predict_discharge_time(
                 sensor_data['soc'], sensor_data['current']
             )
             
@@ -715,31 +786,44 @@ def main():
             st.metric("Health Score", f"{sensor_data['health_score']}%")
             st.metric("Energy Consumed", f"{sensor_data['energy_consumed']} Wh")
     
+    lap("desktop_view")
+    
     # ==================== DATA VISUALIZATION ====================
     if not st.session_state.show_mobile:
         st.markdown('<div class="section-header">📊 DATA VISUALIZATION</div>', unsafe_allow_html=True)
         
-        if len(st.session_state.sensor_data) > 1:
-            df = pd.DataFrame(st.session_state.sensor_data)
+        # Hold the engine lock while charts read the zero-copy history views
+        with engine.lock:
+            if len(engine.history) > 1:
+                df = engine.history.to_frame(['voltage', 'soc', 'temperature', 'current', 'efficiency'])
+                lap("dataframe")
+                # Cap each chart's payload; min-max buckets keep fault spikes visible
+                voltage_df = downsample_frame(df[['voltage']])
+                soc_df = downsample_frame(df[['soc']])
+                temperature_df = downsample_frame(df[['temperature']])
+                performance_df = downsample_frame(df[['current', 'efficiency']])
+                lap("downsample")
             
-            tab1, tab2, tab3 = st.tabs(["📈 Voltage & SOC", "🌡️ Temperature Trend", "⚡ Performance"])
+                tab1, tab2, tab3 = st.tabs(["📈 Voltage & SOC", "🌡️ Temperature Trend", "⚡ Performance"])
             
-            with tab1:
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.line_chart(df['voltage'], use_container_width=True)
-                    st.caption("⚡ Voltage Profile (User Input Based)")
-                with col2:
-                    st.line_chart(df['soc'], use_container_width=True)
-                    st.caption("🔋 State of Charge")
+                with tab1:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.line_chart(voltage_df, use_container_width=True)
+                        st.caption("⚡ Voltage Profile (User Input Based)")
+                    with col2:
+                        st.line_chart(soc_df, use_container_width=True)
+                        st.caption("🔋 State of Charge")
             
-            with tab2:
-                st.area_chart(df['temperature'], use_container_width=True)
-                st.caption("🌡️ Temperature Trend - Affected by User Load Input")
+                with tab2:
+                    st.area_chart(temperature_df, use_container_width=True)
+                    st.caption("🌡️ Temperature Trend - Affected by User Load Input")
             
-            with tab3:
-                st.line_chart(df[['current', 'efficiency']], use_container_width=True)
-                st.caption("⚡ Current vs Efficiency")
+                with tab3:
+                    st.line_chart(performance_df, use_container_width=True)
+                    st.caption("⚡ Current vs Efficiency")
+    
+    lap("charts")
     
     # ==================== EXPORT & REPORTS ====================
     st.markdown('<div class="section-header">📄 EXPORT & ANALYSIS</div>', unsafe_allow_html=True)
@@ -747,25 +831,49 @@ def main():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if st.button("📊 GENERATE CSV REPORT", use_container_width=True):
-            if len(st.session_state.sensor_data) > 1:
-                df = pd.DataFrame(st.session_state.sensor_data)
-                st.markdown(create_csv_download(df, "battery_performance.csv"), unsafe_allow_html=True)
-                st.session_state.digital_twin.log_event("CSV Report Generated", "SUCCESS")
+        export_format = st.radio("Export format", ["csv", "parquet"], horizontal=True, key="export_format",
+                                 format_func=str.upper, label_visibility="collapsed")
+        export_columns = st.multiselect("Columns", list(TELEMETRY_COLUMNS), default=list(TELEMETRY_COLUMNS),
+                                        key="export_columns")
+        compression = "none"
+        if export_format == "parquet":
+            compression = st.selectbox("Compression", PARQUET_COMPRESSIONS, key="export_compression")
+        if st.button("📊 GENERATE DATA EXPORT", use_container_width=True, disabled=not export_columns):
+            filename = f"battery_performance.{export_format}"
+            # Copy the history under the lock, then stream it to this session's own file without holding it
+            with engine.lock:
+                history = engine.history.snapshot(export_columns) if len(engine.history) > 1 else None
+            export_path = None
+            if history is not None:
+                export_path = export_history(history, os.path.join(
+                    DEFAULT_EXPORT_DIR, f"battery_performance_{session_id()}.{export_format}"),
+                    compression=compression)
+            if export_path:
+                # The download button keeps its own in-memory copy, so the file is not needed once served
+                try:
+                    with open(export_path, "rb") as f:
+                        st.download_button(f"📥 {filename}", f, file_name=filename,
+                                           mime=EXPORT_MIME_TYPES[export_format], use_container_width=True)
+                finally:
+                    os.remove(export_path)
+                digital_twin.log_event(f"{export_format.upper()} Export Generated", "SUCCESS")
     
     with col2:
         if st.button("📄 GENERATE PDF REPORT", use_container_width=True):
-            pdf_report = create_pdf_report(sensor_data, st.session_state.digital_twin)
+            pdf_report = create_pdf_report(sensor_data, digital_twin)
             # Show report preview
             st.text_area("📋 REPORT PREVIEW (Copy or Download below):", pdf_report, height=300)
-            # Provide download link
-            st.markdown(create_pdf_download(pdf_report, "EV_Battery_Report.txt"), unsafe_allow_html=True)
-            st.session_state.digital_twin.log_event("PDF Report Generated", "SUCCESS")
+            # Provide download button
+            st.download_button("📄 EV_Battery_Report.txt", pdf_report, file_name="EV_Battery_Report.txt",
+                               mime="text/plain", use_container_width=True)
+            digital_twin.log_event("PDF Report Generated", "SUCCESS")
     
     with col3:
         if st.button("🔄 LIVE DATA STREAM", use_container_width=True):
             st.info("🔄 Live data streaming active - Real-time monitoring enabled")
-            st.session_state.digital_twin.log_event("Live data streaming enabled", "INFO")
+            digital_twin.log_event("Live data streaming enabled", "INFO")
+    
+    lap("export")
     
     # ==================== AI INSIGHTS ====================
     st.markdown('<div class="section-header">🤖 AI-POWERED ANALYTICS</div>', unsafe_allow_html=True)
@@ -773,7 +881,7 @@ def main():
     insight_col1, insight_col2, insight_col3 = st.columns(3)
     
     with insight_col1:
-        load_risk = st.session_state.digital_twin.load_percentage / 100.0 * 0.3
+        load_risk = digital_twin.load_percentage / 100.0 * 0.3
         temp_risk = max(0, sensor_data['temperature'] - 30) * 0.02
         risk_score = min(1.0, load_risk + temp_risk)
         
@@ -790,18 +898,18 @@ def main():
         st.info(f"""
         **🔧 PREDICTIVE MAINTENANCE**
         
-        • User Load: **{st.session_state.digital_twin.load_percentage}%**
-        • Cooling: **{st.session_state.digital_twin.pwm_percentage}%**
-        • Base Temp: **{st.session_state.digital_twin.base_temperature}°C**
+        • User Load: **{digital_twin.load_percentage}%**
+        • Cooling: **{digital_twin.pwm_percentage}%**
+        • Base Temp: **{digital_twin.base_temperature}°C**
         • Efficiency: **{sensor_data['efficiency']}%**
         """)
     
     with insight_col3:
-        recommendation = "Reduce load" if st.session_state.digital_twin.load_percentage > 70 else "Optimal load"
+        recommendation = "Reduce load" if digital_twin.load_percentage > 70 else "Optimal load"
         st.success(f"""
         **💡 SMART OPTIMIZATION**
         
-        • Current Load: **{st.session_state.digital_twin.load_percentage}%**
+        • Current Load: **{digital_twin.load_percentage}%**
         • Recommendation: **{recommendation}**
         • Optimal Temp: **< 35°C**
         • Maintain SOC: **20-80%**
@@ -810,11 +918,166 @@ def main():
     # COMPETITION FOOTER
     st.markdown("---")
     st.success("🏆 **KPIT SPARKLE 2025 READY** - Industry-Grade EV Digital Twin with Real User Input Control & Professional Monitoring System")
+    lap("ai_insights")
+    
+    # ==================== LIMIT MONITOR ====================
+    if not st.session_state.show_mobile:
+        st.markdown('<div class="section-header">📈 ROLLING STATISTICS & LIMIT MONITOR</div>', unsafe_allow_html=True)
+        
+        with engine.lock:
+            violations = engine.state['limit_detector'].active_rules()
+            stats = engine.state['rolling_stats'].summary()
+            window = engine.state['rolling_stats'].count
+        
+        monitor_col1, monitor_col2 = st.columns([1, 2])
+        with monitor_col1:
+            if not violations:
+                st.success("✅ **ALL LIMITS OK**\n\nNo fault or safe-limit violations")
+            for message, channel, _, limit, status in violations:
+                alert = st.error if status == "DANGER" else st.warning
+                alert(f"**{message}**\n\n{channel.title()}: {sensor_data[channel]} (limit {limit})")
+        with monitor_col2:
+            st.dataframe(pd.DataFrame(stats).T.round(3), use_container_width=True)
+            st.caption(f"📈 Rolling statistics over the last {window} ticks (rate = change per tick)")
+    lap("monitor")
+    
+    # ==================== PHYSICS CO-SIMULATION ====================
+    worker = engine.state['physics']
+    physics = worker.latest
+    if engine.state.get('physics_enabled'):
+        st.markdown('<div class="section-header">🔬 PYBAMM PHYSICS CO-SIMULATION</div>', unsafe_allow_html=True)
+        if worker.error is not None:
+            st.error(f"⚠️ **PYBAMM CO-SIMULATION FAILED** - {type(worker.error).__name__}: {worker.error}\n\n"
+                     "Showing twin-only telemetry; untick and tick 🔬 PYBAMM CO-SIMULATION to restart it")
+        elif physics is None:
+            st.info("🔬 Building the SPMe cell model in the background - twin telemetry continues meanwhile")
+        else:
+            physics_cols = st.columns(5)
+            physics_cols[0].metric("Pack Voltage (PyBaMM)", f"{physics['pack_voltage']:.2f} V",
+                                   f"{physics['pack_voltage'] - sensor_data['voltage']:+.2f} V vs twin")
+            physics_cols[1].metric("Cell SOC", f"{physics['soc'] * 100:.1f}%")
+            physics_cols[2].metric("Cell Temperature", f"{physics['temperature']:.1f}°C")
+            physics_cols[3].metric("Cell Current", f"{physics['current']:.2f} A")
+            physics_cols[4].metric("Solve Time", f"{physics['step_ms']:.1f} ms")
+            if physics['limited']:
+                st.warning("🔋 Cell at a voltage cut-off - current in that direction is blocked until it reverses")
+            st.caption(f"🔬 SPMe cell stepped {PHYSICS_STEP_SECONDS:.0f} s per tick from its last state "
+                       f"(simulated time {physics['time'] / 60:.1f} min, {worker.pending} ticks queued, "
+                       f"{worker.dropped} dropped)")
+    lap("physics")
+    
+    # ==================== DIAGNOSTICS ====================
+    if session_profiler().enabled:
+        show_diagnostics_panel()
+
+def main():
+    # Instrumentation costs one attribute check per stage while the panel is off
+    profiler = session_profiler()
+    profiler.enabled = st.session_state.get('show_diagnostics', False)
+    lap = profiler.stopwatch("page.")
+    setup_page()
+    
+    # Initialize digital twin
+    if 'digital_twin' not in st.session_state:
+        st.session_state.digital_twin = EVDigitalTwin()
+    
+    # Initialize session state
+    if 'engine' not in st.session_state:
+        st.session_state.sensor_data = TelemetryHistory(st.session_state.digital_twin.simulation_steps)
+        st.session_state.engine = TwinEngine(
+            twin_step, st.session_state.sensor_data,
+            state={'digital_twin': st.session_state.digital_twin, 'last_soc': 65, 'is_charging': True,
+                   'profiler': profiler,
+                   'rolling_stats': RollingStats(window=ROLLING_WINDOW),
+                   'physics': CoSimulationWorker(build_physics, step_physics),
+                   'limit_detector': ThresholdDetector(st.session_state.digital_twin.fault_limits,
+                                                       st.session_state.digital_twin.safe_limits)}
+        )
+        st.session_state.show_compare = False
+        st.session_state.show_mobile = False
+    engine = st.session_state.engine
+    lap("setup")
+
+    # PROFESSIONAL HEADER
+    st.markdown('<h1 class="main-header">🔋 EV DIGITAL TWIN PLATFORM</h1>', unsafe_allow_html=True)
+    st.markdown('<h3 style="text-align: center; color: #5c6bc0; margin-bottom: 1rem;">🐅 Team TIGONS | KPIT Sparkle 2025</h3>', unsafe_allow_html=True)
+    
+    # ==================== USER INPUT SECTION ====================
+    show_user_input_section(st.session_state.digital_twin)
+    lap("user_inputs")
+    
+    # ==================== SIDEBAR - VIEW CONTROLS ====================
+    with st.sidebar:
+        st.markdown("### 🎮 VIEW CONTROLS")
+        
+        # Operation Mode
+        mode = st.radio(
+            "**OPERATION MODE:**",
+            ["⚡ FAST CHARGE", "🔋 SMART DISCHARGE", "🔄 AUTO CYCLE"],
+            index=0
+        )
+        new_charging_state = "CHARGE" in mode
+        if new_charging_state != engine.state['is_charging']:
+            engine.state['is_charging'] = new_charging_state
+            event = "Charging Started" if new_charging_state else "Discharging Started"
+            st.session_state.digital_twin.log_event(event, "SUCCESS")
+        
+        st.markdown("---")
+        st.markdown("### 🎯 VIEW MODES")
+        st.session_state.show_compare = st.checkbox("🔀 COMPARE MODE")
+        st.session_state.show_mobile = st.checkbox("📱 MOBILE VIEW", help="Optimized view for field engineers")
+        
+        st.session_state.digital_twin.fault_injected = st.checkbox("⚠️ INJECT FAULT SCENARIOS")
+        voltage_surrogate = None
+        if st.checkbox("⚡ PYBAMM VOLTAGE SURROGATE",
+                       help="Pack voltage from a PyBaMM-built SOC x current x temperature table instead of the linear formula"):
+            try:
+                voltage_surrogate = load_voltage_surrogate()
+            except Exception as e:
+                st.error(f"⚠️ Voltage surrogate unavailable - {type(e).__name__}: {e}")
+        st.session_state.digital_twin.voltage_surrogate = voltage_surrogate
+        engine.state['physics_enabled'] = st.checkbox(
+            "🔬 PYBAMM CO-SIMULATION", help="Step a physics-based cell alongside the twin (built in the background)"
+        )
+        if not engine.state['physics_enabled'] and engine.state['physics'].status != "idle":
+            # Unticking drops the cell, so ticking again restarts it from the twin's current SOC
+            engine.state['physics'].reset(timeout=0)
+        
+        st.markdown("---")
+        st.markdown("### ⏱️ SIMULATION ENGINE")
+        engine.set_rate(st.slider(
+            "**Simulation Rate (ticks/s)**", 0.5, 20.0, float(engine.tick_hz), 0.5,
+            help="SIMULATION SPEED: Runs in the background, independent of the display refresh"
+        ))
+        
+        st.markdown("---")
+        st.markdown("### 📊 SYSTEM STATUS")
+        
+        if st.session_state.sensor_data:
+            st.metric("Uptime", f"{(datetime.now() - st.session_state.digital_twin.start_time).seconds // 60} min")
+            st.metric("Data Points", len(st.session_state.sensor_data))
+            st.metric("Simulation Ticks", engine.tick_count)
+            st.metric("Events Logged", len(st.session_state.digital_twin.event_log))
+        
+        st.markdown("---")
+        st.checkbox("🩺 DIAGNOSTICS PANEL", key='show_diagnostics', help="Per-stage refresh timings (p50/p95/p99)")
+    lap("sidebar")
+
+    # ==================== MAIN DASHBOARD ====================
+    
+    # Manage data history based on USER INPUT
+    with engine.lock:
+        st.session_state.sensor_data.resize(st.session_state.digital_twin.simulation_steps)
+    
+    # Simulation runs on its own thread; make sure the first render has data
+    if engine.latest is None:
+        engine.tick()
+    engine.start()
+    lap("engine_control")
     
-    # AUTO-REFRESH
+    # AUTO-REFRESH: only the live section reruns, scheduled by the browser instead of a server-side sleep
     refresh_delay = max(1, 6 - st.session_state.digital_twin.load_percentage / 20)
-    time.sleep(refresh_delay)
-    st.rerun()
+    st.fragment(run_every=refresh_delay)(show_live_dashboard)(engine)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,12 @@
+import numpy as np
+
+from simulation.battery_model import BatteryDigitalTwin
+
+
+def test_fade_has_no_first_cycle_step():
+    summary = BatteryDigitalTwin(fidelity="SPM", verbose=False).simulate_aging(4)["summary"]
+    steps = np.diff(summary["capacity_fade_pct"].to_numpy())
+    assert summary["capacity_fade_pct"].iloc[0] == 0
+    assert (steps > 0).all()
+    # The formation cycle absorbs the initial-state artefact, so cycle 1 -> 2 fades like any later cycle
+    assert steps[0] < 3 * steps[1:].mean()
@@ -0,0 +1,72 @@
+import logging
+import threading
+import time
+
+from dashboard.cosim_worker import CoSimulationWorker
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_submit_does_not_wait_for_the_build():
+    release = threading.Event()
+
+    def slow_build(request):
+        release.wait(2.0)
+        return []
+
+    def step(steps, request):
+        steps.append(request)
+        return {'steps': len(steps), 'last': request}
+
+    worker = CoSimulationWorker(slow_build, step)
+    start = time.perf_counter()
+    for i in range(3):
+        assert worker.submit(i)
+    assert time.perf_counter() - start < 0.1
+    assert wait_for(lambda: worker.status == "building")
+    assert worker.latest is None
+    release.set()
+    assert wait_for(lambda: worker.latest == {'steps': 3, 'last': 2})
+    worker.reset()
+
+
+def test_solver_error_stops_physics_until_reset(caplog):
+    def step(cosimulation, request):
+        if request == "bad":
+            raise RuntimeError("solver diverged")
+        return request
+
+    worker = CoSimulationWorker(lambda request: object(), step)
+    with caplog.at_level(logging.ERROR, logger="dashboard.cosim_worker"):
+        worker.submit("good")
+        worker.submit("bad")
+        assert wait_for(lambda: worker.error is not None)
+    assert isinstance(worker.error, RuntimeError) and worker.status == "failed"
+    assert worker.latest == "good"
+    assert not worker.submit("good")
+    assert any(record.exc_info for record in caplog.records)
+
+    worker.reset()
+    assert worker.error is None and worker.latest is None
+    worker.submit("again")
+    assert wait_for(lambda: worker.latest == "again")
+    worker.reset()
+
+
+def test_full_queue_drops_ticks():
+    release = threading.Event()
+    worker = CoSimulationWorker(lambda request: release.wait(2.0), lambda cosimulation, request: request,
+                                max_pending=2)
+    worker.submit(0)
+    assert wait_for(lambda: worker.status == "building")
+    for i in range(1, 10):
+        worker.submit(i)
+    # Two requests wait behind the build, the rest are dropped
+    assert worker.pending == 2 and worker.dropped == 7
+    release.set()
+    worker.reset()
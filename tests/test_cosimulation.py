@@ -0,0 +1,34 @@
+import pytest
+
+from simulation.battery_model import BatteryDigitalTwin
+
+
+@pytest.fixture(scope="module")
+def battery():
+    return BatteryDigitalTwin(fidelity="SPM", verbose=False)
+
+
+def test_each_cosimulation_starts_from_its_own_soc(battery):
+    first = battery.start_cosimulation(initial_soc=0.1)
+    low = first.step(0.0, dt=10.0)
+    second = battery.start_cosimulation(initial_soc=0.97)
+    high = second.step(0.0, dt=10.0)
+    assert low["voltage"] < 3.5
+    assert high["voltage"] == pytest.approx(4.15, abs=0.05)
+    assert high["soc"] == pytest.approx(0.97)
+
+    # Charging from 97% stops at the upper cut-off instead of running past full
+    for _ in range(60):
+        state = second.step(-5.0, dt=10.0)
+    assert state["soc"] <= 1.0
+    assert state["limited"]
+    # The first co-simulation keeps its own state
+    assert first.step(0.0, dt=10.0)["voltage"] == pytest.approx(low["voltage"], abs=0.05)
+
+
+def test_step_times_stay_bounded(battery, monkeypatch):
+    monkeypatch.setattr("simulation.battery_model.COSIM_TIMING_WINDOW", 5)
+    cosim = battery.start_cosimulation(initial_soc=0.5)
+    for _ in range(12):
+        cosim.step(1.0, dt=1.0)
+    assert len(cosim.step_times) == 5
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulation.battery_model import BatteryDigitalTwin
+from simulation.history_writer import HistoryWriter
+
+
+@pytest.fixture(scope="module")
+def battery():
+    return BatteryDigitalTwin(fidelity="SPM", verbose=False)
+
+
+def profile():
+    time = np.arange(0.0, 600.0)
+    return {'name': "test", 'kind': "current", 'time': time, 'values': 2.0 + np.sin(time / 30)}
+
+
+def test_profile_streams_every_sample(battery, tmp_path):
+    output = tmp_path / "profile.parquet"
+    summary = battery.simulate_profile(profile(), str(output), chunk_seconds=200, initial_soc=0.9)
+    frame = pd.read_parquet(output)
+    assert len(frame) == summary['rows'] == 600
+    assert list(tmp_path.iterdir()) == [output]
+
+
+def test_failed_chunk_leaves_no_temp_file(battery, tmp_path, monkeypatch):
+    write = HistoryWriter.write
+    calls = []
+
+    def failing_write(self, history):
+        calls.append(1)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        write(self, history)
+
+    monkeypatch.setattr(HistoryWriter, "write", failing_write)
+    with pytest.raises(KeyboardInterrupt):
+        battery.simulate_profile(profile(), str(tmp_path / "profile.csv"), chunk_seconds=200, initial_soc=0.9)
+    assert list(tmp_path.iterdir()) == []
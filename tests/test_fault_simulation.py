@@ -0,0 +1,12 @@
+from simulation.fault_simulation import FaultScenario
+from streamlit_app import EVDigitalTwin
+
+
+def test_empty_scripted_scenario_injects_no_faults():
+    twin = EVDigitalTwin()
+    twin.fault_injected = True
+    twin.fault_scenario = FaultScenario()
+    sample = {'voltage': 11.0, 'current': 30.0, 'temperature': 30.0}
+    for _ in range(500):
+        assert twin.simulate_fault(dict(sample)) == sample
+    assert len(twin._fault_engine.scenario) == 0
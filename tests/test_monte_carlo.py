@@ -0,0 +1,25 @@
+import numpy as np
+
+from simulation.monte_carlo import StreamingBands
+
+
+def test_failed_runs_are_not_counted():
+    bands = StreamingBands(np.arange(5.0))
+    batch = {name: np.full((4, 5), value) for name, value in (("voltage", 3.7), ("temperature", 25.0))}
+    batch["voltage"][1] = batch["temperature"][1] = np.nan
+    batch["voltage"][2, 3:] = batch["temperature"][2, 3:] = np.nan
+    bands.update(batch)
+    assert bands.runs == 3
+    assert list(bands.count("voltage")) == [3, 3, 3, 2, 2]
+
+
+def test_percentiles_within_a_bin_of_numpy():
+    rng = np.random.default_rng(0)
+    values = 3.8 + 0.01 * rng.standard_normal((400, 50)) + 0.001 * np.arange(50)
+    bands = StreamingBands(np.arange(50.0))
+    for start in range(0, 400, 8):
+        block = values[start:start + 8]
+        bands.update({"voltage": block, "temperature": 25 + block})
+    for q in (5, 50, 95):
+        error = np.abs(bands.percentile("voltage", q) - np.percentile(values, q, axis=0))
+        assert (error <= bands.width["voltage"]).all()
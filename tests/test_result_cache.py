@@ -0,0 +1,33 @@
+import pybamm
+import pytest
+
+from simulation.result_cache import simulation_key
+
+
+@pytest.fixture(scope="module")
+def setup():
+    return pybamm.lithium_ion.SPM(), pybamm.ParameterValues("Chen2020"), pybamm.IDAKLUSolver()
+
+
+def key_with(setup, value, name="Ambient temperature [K]"):
+    model, parameter_values, solver = setup
+    parameter_values = parameter_values.copy()
+    parameter_values.update({name: value})
+    return simulation_key(model, parameter_values, ["Rest for 10 seconds"], solver)
+
+
+def test_lambdas_with_one_name_get_different_keys(setup):
+    assert key_with(setup, lambda y, z, t: 298.15) != key_with(setup, lambda y, z, t: 308.15)
+
+
+def test_closures_and_repeat_calls(setup):
+    def ambient(kelvin):
+        return lambda y, z, t: kelvin + 0 * t
+    assert key_with(setup, ambient(298.15)) == key_with(setup, ambient(298.15))
+    assert key_with(setup, ambient(298.15)) != key_with(setup, ambient(308.15))
+
+
+def test_pybamm_version_is_part_of_the_key(setup, monkeypatch):
+    before = key_with(setup, 298.15)
+    monkeypatch.setattr(pybamm, "__version__", "0.0.0")
+    assert key_with(setup, 298.15) != before
@@ -0,0 +1,14 @@
+import numpy as np
+
+from ai_models.reinforcement_learning.rl_agent import TARGET_SOC, VectorChargingEnv
+
+
+def test_info_keeps_the_finished_state():
+    env = VectorChargingEnv(64, seed=0)
+    env.soc[:32] = TARGET_SOC - 0.5
+    reward, done, info = env.step(np.zeros(64, dtype=int))
+    assert done[:32].all()
+    # reset() must not rewrite the state reported for envs that just finished
+    assert (info['soc'][done] >= TARGET_SOC).all()
+    assert not np.shares_memory(info['soc'], env.soc)
+    assert not np.shares_memory(info['temperature'], env.temperature)
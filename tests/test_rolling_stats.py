@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from dashboard.rolling_stats import ThresholdDetector
+from simulation.fault_simulation import FaultEngine, FaultScenario
+from simulation.fleet_simulation import FleetSensorGenerator
+from streamlit_app import EVDigitalTwin, generate_sensor_data
+
+
+@pytest.mark.parametrize("load_percentage, noise_level", [(50, 0.1), (100, 0.5)])
+@pytest.mark.parametrize("is_charging", [True, False])
+def test_healthy_twin_raises_no_alerts(is_charging, load_percentage, noise_level):
+    np.random.seed(0)
+    twin = EVDigitalTwin()
+    twin.load_percentage = load_percentage
+    twin.noise_level = noise_level
+    detector = ThresholdDetector(twin.fault_limits, twin.safe_limits)
+    soc = 65
+    alerts = []
+    for _ in range(500):
+        sample = generate_sensor_data(soc, is_charging, twin)
+        soc = sample['soc']
+        alerts.extend(rule[0] for rule in detector.check_sample(sample))
+    assert alerts == []
+
+
+def test_healthy_fleet_raises_no_alerts():
+    twin = EVDigitalTwin()
+    generator = FleetSensorGenerator(200, load_percentage=100, noise_level=0.5, seed=0)
+    detector = ThresholdDetector(twin.fault_limits, twin.safe_limits, n_streams=200)
+    history = generator.run(300)
+    for t in range(300):
+        active, _ = detector.check(np.stack([history[name][t] for name in detector.channels], axis=-1))
+        assert not active.any()
+
+
+@pytest.mark.parametrize("current", [75.0, -75.0])
+def test_over_current_fires_in_both_directions(current):
+    twin = EVDigitalTwin()
+    detector = ThresholdDetector(twin.fault_limits, twin.safe_limits)
+    sample = {'voltage': 11.0, 'temperature': 30.0, 'current': current}
+    assert [rule[0] for rule in detector.check_sample(sample)] == ["⚡ CURRENT ABOVE FAULT LIMIT"]
+    # Still active on the next sample, so no second onset
+    assert detector.check_sample(sample) == []
+
+
+def test_injected_faults_are_detected():
+    twin = EVDigitalTwin()
+    engine = FaultEngine(FaultScenario().add('voltage_drop', 0, duration=1).add('over_current', 2, duration=1),
+                         twin.fault_limits)
+    detector = ThresholdDetector(twin.fault_limits, twin.safe_limits)
+    fired = []
+    for step in range(4):
+        sample = {'voltage': np.array([11.0]), 'temperature': np.array([30.0]), 'current': np.array([-40.0])}
+        engine.apply(step, sample)
+        fired.extend(rule[0] for rule in detector.check_sample({name: sample[name][0] for name in detector.channels}))
+    assert "⚠️ VOLTAGE BELOW FAULT LIMIT" in fired
+    assert "⚡ CURRENT ABOVE FAULT LIMIT" in fired
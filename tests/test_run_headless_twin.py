@@ -0,0 +1,13 @@
+import pandas as pd
+import pytest
+
+from run_headless_twin import OUTPUT_COLUMNS, main
+
+
+@pytest.mark.parametrize("suffix", ["csv", "parquet"])
+def test_zero_steps_still_writes_the_columns(tmp_path, suffix):
+    output = tmp_path / f"telemetry.{suffix}"
+    report = main(["--steps", "0", "--output", str(output)])
+    frame = pd.read_parquet(output) if suffix == "parquet" else pd.read_csv(output)
+    assert report['steps'] == 0
+    assert list(frame.columns) == list(OUTPUT_COLUMNS) and frame.empty
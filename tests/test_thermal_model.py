@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from simulation.fleet_simulation import FleetSensorGenerator
+from simulation.thermal_model import LumpedThermalModel
+from streamlit_app import EVDigitalTwin, generate_sensor_data
+
+
+@pytest.mark.parametrize("is_charging", [True, False])
+@pytest.mark.parametrize("pwm_percentage", [0, 75, 100])
+def test_forecast_starts_from_the_twin_reading(is_charging, pwm_percentage):
+    np.random.seed(0)
+    twin = EVDigitalTwin()
+    twin.pwm_percentage = pwm_percentage
+    soc = 65
+    errors = []
+    for _ in range(200):
+        sample = generate_sensor_data(soc, is_charging, twin)
+        soc = sample['soc']
+        predicted = twin.predict_temperature(sample['temperature'], sample['current'], sample['voltage'],
+                                             is_charging)
+        errors.append(predicted - sample['temperature'])
+    # Readings sit at the model's steady state, so only the ±1°C sensor noise is left to relax
+    assert abs(np.mean(errors)) < 0.2
+    assert np.max(np.abs(errors)) < 1.0
+
+
+def test_fleet_readings_match_the_model_steady_state():
+    generator = FleetSensorGenerator(1000, pwm_percentage=np.linspace(0, 100, 1000), seed=0)
+    sample = generator.step()
+    model = LumpedThermalModel()
+    heating = model.heating_rate(sample['current'], sample['voltage'], sample['is_charging'],
+                                 generator.load_percentage, generator.pwm_percentage)
+    equilibrium = generator.base_temperature + heating * model.time_constant_min
+    assert np.abs(sample['temperature'] - equilibrium).max() <= 1.1
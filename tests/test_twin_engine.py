@@ -0,0 +1,47 @@
+import logging
+import time
+
+from dashboard.twin_engine import TwinEngine
+
+
+def failing_step(engine):
+    raise RuntimeError("solver blew up")
+
+
+def test_tick_errors_are_reported(caplog):
+    history = []
+    engine = TwinEngine(failing_step, history, tick_hz=50)
+    with caplog.at_level(logging.ERROR, logger="dashboard.twin_engine"):
+        engine.start()
+        deadline = time.monotonic() + 2.0
+        while engine.error_count < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        engine.stop()
+
+    assert isinstance(engine.last_error, RuntimeError)
+    assert engine.error_count >= 3
+    assert history == []
+    # The traceback is logged once per run of failures, not on every tick
+    failures = [record for record in caplog.records if "tick" in record.getMessage()]
+    assert len(failures) == 1 and failures[0].exc_info is not None
+
+
+def test_error_clears_after_a_good_tick():
+    calls = []
+
+    def flaky_step(engine):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("first tick fails")
+        return {'tick': len(calls)}
+
+    history = []
+    engine = TwinEngine(flaky_step, history, tick_hz=50)
+    engine.start()
+    deadline = time.monotonic() + 2.0
+    while not history and time.monotonic() < deadline:
+        time.sleep(0.01)
+    engine.stop()
+
+    assert history and engine.last_error is None
+    assert engine.error_count == 1